@@ -2,17 +2,88 @@ from email.mime import text
 from email.utils import parseaddr
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import List, Optional, Tuple
+import asyncio
 import imaplib
-import email
-from email.header import decode_header
+import os
+from concurrent.futures import ThreadPoolExecutor
+from email import policy
+from email.header import decode_header, make_header
+from email.parser import BytesParser
 import html2text
 import re
-from bs4 import BeautifulSoup
+import threading
+import lxml.html
+from lxml.etree import ParserError
 from urllib.parse import urlparse
 from fastapi.middleware.cors import CORSMiddleware
 
 
+# messages per FETCH command; keeps the command line under server request-size limits
+FETCH_BATCH_SIZE = 100
+
+# only From/Subject plus the MIME headers needed to parse the body; PEEK leaves \Seen untouched
+FETCH_ITEMS = (
+    "(BODY.PEEK[HEADER.FIELDS (FROM SUBJECT MIME-VERSION CONTENT-TYPE CONTENT-TRANSFER-ENCODING)]"
+    " BODY.PEEK[TEXT])"
+)
+
+# signatures live at the bottom of a message; nothing above this many cleaned lines is scanned
+SIGNATURE_WINDOW = 30
+
+# concurrent /fetch-signatures requests; each holds one IMAP connection while it runs
+FETCH_WORKERS = int(os.getenv("FETCH_WORKERS", "8"))
+
+_PARSER = BytesParser(policy=policy.default)
+_FETCH_START_RE = re.compile(rb"\d+ \(")
+
+
+def _collect_fetched(msg_data) -> dict:
+    """
+    Map sequence number -> raw message from a batched FETCH response.
+    Each message arrives as a header-section tuple and a text-section tuple;
+    they are glued back together (header first) so the result parses as a message.
+    """
+    sections = {}
+    seq = None
+    for item in msg_data:
+        if not isinstance(item, tuple):
+            continue
+        envelope, literal = item
+        if _FETCH_START_RE.match(envelope):
+            # envelope looks like b'42 (BODY[HEADER.FIELDS (...)] {1234}'
+            seq = envelope.split(None, 1)[0]
+        if seq is not None:
+            sections.setdefault(seq, {})["header" if b"HEADER" in envelope else "text"] = literal
+    fetched = {}
+    for seq, parts in sections.items():
+        header = parts.get("header") or b""
+        if header and not header.endswith((b"\r\n\r\n", b"\n\n")):
+            header += b"\r\n"
+        fetched[seq] = header + (parts.get("text") or b"")
+    return fetched
+
+
+def _header(msg, name: str) -> Optional[str]:
+    """
+    Header value as a decoded str, or None when absent. policy.default parses
+    structured headers on access and raises on malformed ones (e.g. "From: <");
+    fall back to the raw value so one junk header does not fail the request.
+    """
+    try:
+        value = msg.get(name)
+        return str(value) if value is not None else None
+    except Exception:
+        pass
+    for key, raw in msg.raw_items():
+        if key.lower() == name.lower():
+            try:
+                return str(make_header(decode_header(raw)))
+            except Exception:
+                return str(raw)
+    return None
+
+
 # -------------------------------
 # Pydantic model for API input
 # -------------------------------
@@ -73,19 +144,89 @@ class ImprovedSignatureExtractor:
             r'^Best regards?[,!]?\s*$',
         ]
 
+        self.company_indicators = [
+            r'\b(Inc|LLC|Ltd|Corp|Corporation|Company|Co\.|GmbH|Pvt|Private Limited|LLP)\b',
+            r'\b(Technologies|Solutions|Services|Systems|Software|Consulting|Group)\b',
+        ]
+
+        self.address_keywords = [
+            r'\b(Street|St|Road|Rd|Avenue|Ave|Boulevard|Blvd|Lane|Ln|Drive|Dr)\b',
+            r'\b(Suite|Ste|Floor|Fl|Room|Unit|Building|Tower|Center|Centre)\b',
+            r'\b(City|State|Province|Country|Zip|Postal|Code)\b',
+            r'\d{3,6}',
+        ]
+
+        # Compiled once per extractor; the hot per-line loops below use these directly
+        self._email_re = re.compile(self.email_pattern, re.IGNORECASE)
+        self._phone_re = re.compile(self.phone_pattern)
+        self._website_re = re.compile(self.website_pattern)
+        # "email, phone or website anywhere on this line?" check
+        self._component_re = re.compile(
+            rf"(?P<email>{self.email_pattern})|(?P<phone>{self.phone_pattern})|(?P<web>{self.website_pattern})"
+        )
+        # emails and phones in a single scan; email is tried first so addresses are not split up
+        self._email_phone_re = re.compile(rf"(?P<email>{self.email_pattern})|(?P<phone>{self.phone_pattern})")
+        # "does this line carry contact info?" checks: one search instead of one per pattern
+        self._contact_re = re.compile(rf"{self.email_pattern}|{self.phone_pattern}")
+        # Each pattern family is OR-ed into one regex so a line is scanned once, not once per pattern
+        self._metadata_union = self._union(self.metadata_patterns)
+        self._sep_union = self._union(self.signature_separators)
+        self._company_union = self._union(self.company_indicators)
+        self._addr_union = self._union(self.address_keywords)
+        # every title keyword in one case-insensitive alternation: one scan of the line as-is,
+        # instead of one search per title over a lowered copy
+        self._title_union = re.compile(
+            r'\b(?:' + '|'.join(re.escape(t.lower()) for t in self.job_titles) + r')\b', re.IGNORECASE
+        )
+        self._closing_re = re.compile(
+            r'\b(Best|Regards|Sincerely|Thank you|Thanks|Cheers|Warm regards|Kind regards|Best regards)\b',
+            re.IGNORECASE,
+        )
+        self._blocked_email_re = re.compile(r'(example\.com|test\.com|localhost)', re.IGNORECASE)
+        self._phone_junk_re = re.compile(r'[^\d+\-\s]')
+        self._digit_re = re.compile(r'\d')
+        self._bracket_re = re.compile(r'[|\[\]{}]')
+        self._ws_re = re.compile(r'\s+')
+        self._unsub_re = re.compile(
+            r'(unsubscribe|click here|opt[- ]out|privacy policy|terms of service)[^\n]*', re.IGNORECASE
+        )
+        self._unsub_url_re = re.compile(r'https?://[^\s]*(?:unsubscribe|optout|remove)[^\s]*', re.IGNORECASE)
+
+        self._local = threading.local()
+
+    @staticmethod
+    def _union(patterns: List[str]) -> re.Pattern:
+        return re.compile("|".join(f"(?:{p})" for p in patterns), re.IGNORECASE)
+
     # ------------------- Cleaning HTML / Text -------------------
-    def clean_html(self, raw_text: str) -> str:
-        soup = BeautifulSoup(raw_text, 'html.parser')
-        for script in soup(["script", "style", "meta", "link", "head"]):
-            script.decompose()
-        text = soup.get_text(separator='\n')
+    def clean_html(self, raw_text: str, is_html: Optional[bool] = None) -> str:
+        # text/plain bodies (or, when the caller doesn't know, bodies without a single tag) skip parsing
+        if is_html is False or (is_html is None and '<' not in raw_text):
+            return raw_text
+        # lxml (libxml2) instead of the pure-Python html.parser; html2text stays as the last resort
+        text = ""
+        try:
+            root = lxml.html.document_fromstring(raw_text)
+            for tag in list(root.iter("script", "style", "meta", "link", "head")):
+                tag.drop_tree()
+            text = "\n".join(root.itertext())
+        except (ParserError, ValueError):
+            # empty document, or a str carrying an XML encoding declaration
+            pass
         if not text.strip():
+            text = self._html2text().handle(raw_text)
+        return text
+
+    def _html2text(self) -> html2text.HTML2Text:
+        # HTML2Text is a stateful parser: build it once per thread, not once per email
+        h = getattr(self._local, "h2t", None)
+        if h is None:
             h = html2text.HTML2Text()
             h.ignore_links = True
             h.ignore_images = True
             h.ignore_emphasis = False
-            text = h.handle(raw_text)
-        return text
+            self._local.h2t = h
+        return h
 
     def remove_metadata_lines(self, lines: List[str]) -> List[str]:
         cleaned = []
@@ -93,51 +234,75 @@ class ImprovedSignatureExtractor:
             line = line.strip()
             if not line:
                 continue
-            if any(re.match(p, line, re.IGNORECASE) for p in self.metadata_patterns):
+            if self._metadata_union.match(line):
                 continue
             cleaned.append(line)
         return cleaned
 
-    def clean_text(self, raw_text: str) -> List[str]:
-        text = self.clean_html(raw_text)
-        text = re.sub(r'(unsubscribe|click here|opt[- ]out|privacy policy|terms of service)[^\n]*', '', text, flags=re.IGNORECASE)
-        text = re.sub(r'https?://[^\s]*(?:unsubscribe|optout|remove)[^\s]*', '', text, flags=re.IGNORECASE)
-        lines = [line.strip() for line in text.splitlines() if line.strip()]
-        lines = self.remove_metadata_lines(lines)
-        # remove consecutive duplicates
+    def clean_text(self, raw_text: str, is_html: Optional[bool] = None) -> List[str]:
+        text = self.clean_html(raw_text, is_html)
+        text = self._unsub_re.sub('', text)
+        text = self._unsub_url_re.sub('', text)
+        # strip, drop blank/metadata lines and collapse consecutive duplicates in one pass
         cleaned_lines = []
         prev_line = None
-        for line in lines:
+        for line in text.splitlines():
+            line = line.strip()
+            if not line or self._metadata_union.match(line):
+                continue
             if line != prev_line:
                 cleaned_lines.append(line)
                 prev_line = line
         return cleaned_lines
 
+    def clean_tail(self, raw_text: str, n: int, is_html: Optional[bool] = None) -> List[str]:
+        """
+        The last n lines of clean_text(raw_text), cleaned bottom-up so lines
+        above the window (quoted history, long threads) are never processed.
+        """
+        text = self.clean_html(raw_text, is_html)
+        tail = []
+        for line in reversed(text.splitlines()):
+            line = self._unsub_url_re.sub('', self._unsub_re.sub('', line)).strip()
+            if not line or self._metadata_union.match(line):
+                continue
+            if tail and tail[-1] == line:
+                continue
+            tail.append(line)
+            if len(tail) == n:
+                break
+        tail.reverse()
+        return tail
+
     # ------------------- Signature Detection -------------------
     def find_signature_start(self, lines: List[str]) -> int:
-        for i in range(len(lines) - 1, max(0, len(lines) - 30), -1):
+        for i in range(len(lines) - 1, max(0, len(lines) - SIGNATURE_WINDOW), -1):
             line = lines[i].strip()
-            if any(re.match(p, line, re.IGNORECASE) for p in self.signature_separators):
+            if self._sep_union.match(line):
                 return i
         for i in range(len(lines) - 1, max(0, len(lines) - 25), -1):
-            if re.search(r'\b(Best|Regards|Sincerely|Thank you|Thanks|Cheers|Warm regards|Kind regards|Best regards)\b', lines[i], re.IGNORECASE):
+            if self._closing_re.search(lines[i]):
                 return i
         for i in range(len(lines) - 1, max(0, len(lines) - 20), -1):
-            if re.search(self.email_pattern, lines[i]) or re.search(self.phone_pattern, lines[i]):
+            if self._contact_re.search(lines[i]):
                 return max(0, i - 5)
         return max(0, len(lines) - 15)
 
     # ------------------- Component Extractors -------------------
     def extract_emails(self, text: str) -> List[str]:
-        emails = re.findall(self.email_pattern, text, re.IGNORECASE)
-        return list(dict.fromkeys([e for e in emails if not re.search(r'(example\.com|test\.com|localhost)', e, re.IGNORECASE)]))
+        return self._filter_emails(self._email_re.findall(text))
+
+    def _filter_emails(self, emails: List[str]) -> List[str]:
+        return list(dict.fromkeys([e for e in emails if not self._blocked_email_re.search(e)]))
 
     def extract_phones(self, text: str) -> List[str]:
-        phones = re.findall(self.phone_pattern, text)
+        return self._clean_phones(self._phone_re.findall(text))
+
+    def _clean_phones(self, phones: List[str]) -> List[str]:
         cleaned = []
         for phone in phones:
-            clean = re.sub(r'[^\d+\-\s]', '', phone).strip()
-            if len(re.findall(r'\d', clean)) >= 7:
+            clean = self._phone_junk_re.sub('', phone).strip()
+            if len(self._digit_re.findall(clean)) >= 7:
                 cleaned.append(clean)
         return list(dict.fromkeys(cleaned))
 
@@ -152,45 +317,42 @@ class ImprovedSignatureExtractor:
                     results.append(word)
         return results
 
-
+    def scan_components(self, text: str) -> Tuple[List[str], List[str], List[str]]:
+        """
+        One regex pass over the text for emails and phones together. Websites keep
+        the whole-token scan of extract_website_from_text (last-first, so the one
+        closest to the end of the signature wins); a host pattern would truncate
+        multi-label names like "www.acme.co.uk".
+        """
+        emails, phones = [], []
+        for m in self._email_phone_re.finditer(text):
+            (emails if m.lastgroup == "email" else phones).append(m.group())
+        return self._filter_emails(emails), self._clean_phones(phones), self.extract_website_from_text(text)
 
     def extract_job_title(self, lines: List[str]) -> Optional[str]:
         for line in lines[:10]:
-            line_lower = line.lower()
-            if re.search(self.email_pattern, line) or re.search(self.phone_pattern, line) or re.search(self.website_pattern, line):
+            if self._component_re.search(line):
                 continue
             if len(line) > 80:
                 continue
-            for title in self.job_titles:
-                if re.search(r'\b' + re.escape(title.lower()) + r'\b', line_lower):
-                    cleaned = re.sub(r'[|\[\]{}]', '', line).strip()
-                    if cleaned:
-                        return cleaned
+            if self._title_union.search(line):
+                cleaned = self._bracket_re.sub('', line).strip()
+                if cleaned:
+                    return cleaned
         return None
   
     def extract_company_name(self, lines: List[str]) -> Optional[str]:
-        company_indicators = [
-            r'\b(Inc|LLC|Ltd|Corp|Corporation|Company|Co\.|GmbH|Pvt|Private Limited|LLP)\b',
-            r'\b(Technologies|Solutions|Services|Systems|Software|Consulting|Group)\b',
-        ]
         for line in lines[:10]:
-            if re.search(self.email_pattern, line) or re.search(self.phone_pattern, line):
+            if self._contact_re.search(line):
                 continue
-            for indicator in company_indicators:
-                if re.search(indicator, line, re.IGNORECASE):
-                    cleaned = re.sub(r'[|\[\]{}]', '', line).strip()
-                    if 3 <= len(cleaned) <= 80:
-                        return cleaned
+            if self._company_union.search(line):
+                cleaned = self._bracket_re.sub('', line).strip()
+                if 3 <= len(cleaned) <= 80:
+                    return cleaned
         return None
 
     def extract_address(self, lines: List[str]) -> Optional[str]:
         address_lines = []
-        address_keywords = [
-            r'\b(Street|St|Road|Rd|Avenue|Ave|Boulevard|Blvd|Lane|Ln|Drive|Dr)\b',
-            r'\b(Suite|Ste|Floor|Fl|Room|Unit|Building|Tower|Center|Centre)\b',
-            r'\b(City|State|Province|Country|Zip|Postal|Code)\b',
-            r'\d{3,6}',
-        ]
         # location_names = [
         #     r'\b(New York|Los Angeles|Chicago|Houston|Phoenix|Philadelphia|San Antonio|San Diego|Dallas|San Jose)\b',
         #     r'\b(California|Texas|Florida|New York|Pennsylvania|Illinois|Ohio|Georgia|North Carolina|Michigan|Gujarat|Maharashtra|Karnataka|Delhi)\b',
@@ -199,27 +361,30 @@ class ImprovedSignatureExtractor:
         # ]
         for line in lines:
             line_cleaned = line.strip()
-            if re.search(self.email_pattern, line_cleaned) or re.search(self.phone_pattern, line_cleaned) or re.search(self.website_pattern, line_cleaned):
+            if self._component_re.search(line_cleaned):
                 continue
             if len(line_cleaned) < 5 or len(line_cleaned) > 120:
                 continue
-            if any(re.search(kw, line_cleaned, re.IGNORECASE) for kw in address_keywords):
-                cleaned = re.sub(r'[|\[\]{}]', '', line_cleaned).strip()
-                cleaned = re.sub(r'\s+', ' ', cleaned)
+            if self._addr_union.search(line_cleaned):
+                cleaned = self._bracket_re.sub('', line_cleaned).strip()
+                cleaned = self._ws_re.sub(' ', cleaned)
                 if cleaned and cleaned not in address_lines:
                     address_lines.append(cleaned)
-        return ', '.join(address_lines[:3]) if address_lines else None
+                    # only the first three are reported
+                    if len(address_lines) == 3:
+                        break
+        return ', '.join(address_lines) if address_lines else None
 
     # ------------------- Main Extraction -------------------
-    def extract_signature(self, raw_text: str, sender_header: str = None) -> dict:
-        lines = self.clean_text(raw_text)
+    def extract_signature(self, raw_text: str, sender_header: str = None, is_html: Optional[bool] = None) -> dict:
+        # find_signature_start never looks above the last SIGNATURE_WINDOW lines, so only those
+        # are cleaned; a signature buried higher up (e.g. above a forwarded message) is missed
+        lines = self.clean_tail(raw_text, SIGNATURE_WINDOW, is_html)
         sig_start = self.find_signature_start(lines)
         sig_lines = lines[sig_start:]
         sig_text = '\n'.join(sig_lines)
 
-        emails = self.extract_emails(sig_text)
-        phones = self.extract_phones(sig_text)
-        websites = self.extract_website_from_text(sig_text)
+        emails, phones, websites = self.scan_components(sig_text)
         job_title = self.extract_job_title(sig_lines)
         company_name = self.extract_company_name(sig_lines)
         address = self.extract_address(sig_lines)
@@ -252,9 +417,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 extractor = ImprovedSignatureExtractor()
+_fetch_pool = ThreadPoolExecutor(max_workers=FETCH_WORKERS, thread_name_prefix="fetch-signatures")
 
 @app.post("/fetch-signatures")
 async def fetch_signatures(request: EmailFetchRequest):
+    # imaplib and the extraction are blocking; run them off the event loop so other requests keep being served
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_fetch_pool, _do_fetch, request)
+
+def _do_fetch(request: EmailFetchRequest) -> dict:
     try:
         imap_host = request.imap_host
         imap_port = request.imap_port
@@ -271,51 +442,44 @@ async def fetch_signatures(request: EmailFetchRequest):
             )
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
-        # Select inbox
-        mail.select("inbox")
-
-        # Get email IDs
-        status, data = mail.search(None, "ALL")
+        # Select inbox; the EXISTS count tells us the sequence range, so no SEARCH is needed
+        status, data = mail.select("inbox")
         if status != "OK":
             raise HTTPException(status_code=500, detail="Failed to fetch emails")
 
-        email_ids = data[0].split()[-request.max_messages:]
+        total = int(data[0] or 0)
+        first = max(1, total - request.maxMessages + 1) if request.maxMessages > 0 else 1
         results = []
 
-        for e_id in reversed(email_ids):
-            status, msg_data = mail.fetch(e_id, "(RFC822)")
+        # newest first, one FETCH round-trip per batch of sequence numbers
+        raw_messages = []
+        for hi in range(total, first - 1, -FETCH_BATCH_SIZE):
+            lo = max(first, hi - FETCH_BATCH_SIZE + 1)
+            status, msg_data = mail.fetch(f"{lo}:{hi}", FETCH_ITEMS)
             if status != "OK":
                 continue
+            fetched = _collect_fetched(msg_data)
+            raw_messages.extend(fetched[seq] for seq in (str(n).encode() for n in range(hi, lo - 1, -1)) if seq in fetched)
 
-            raw_email = msg_data[0][1]
-            msg = email.message_from_bytes(raw_email)
+        for raw_email in raw_messages:
+            msg = _PARSER.parsebytes(raw_email)
 
-            # Decode subject
-            subject = None
-            if msg["Subject"]:
-                subject_parts = decode_header(msg["Subject"])
-                subject = "".join(
-                    part.decode(encoding if encoding else "utf-8", errors="ignore") 
-                    if isinstance(part, bytes) else str(part)
-                    for part, encoding in subject_parts
-                )
+            # policy.default hands back the subject already decoded with its declared charset
+            subject = _header(msg, "Subject") or None
 
-            # Extract body
+            # Extract body: decode only the preferred text part, never attachments
             body = ""
-            if msg.is_multipart():
-                for part in msg.walk():
-                    content_type = part.get_content_type()
-                    if content_type in ["text/plain", "text/html"]:
-                        payload = part.get_payload(decode=True)
-                        if payload:
-                            body += payload.decode(errors="ignore")
-            else:
-                payload = msg.get_payload(decode=True)
-                if payload:
-                    body = payload.decode(errors="ignore")
+            body_part = msg.get_body(preferencelist=("plain", "html"))
+            is_html = body_part is not None and body_part.get_content_type() == "text/html"
+            if body_part is not None:
+                try:
+                    body = body_part.get_content()
+                except (LookupError, UnicodeError):
+                    # bogus declared charset
+                    body = (body_part.get_payload(decode=True) or b"").decode("utf-8", errors="replace")
 
             # Extract signature
-            signature = extractor.extract_signature(body, sender_header=msg.get("From"))
+            signature = extractor.extract_signature(body, sender_header=_header(msg, "From"), is_html=is_html)
 
             # Fallback: if sender email not found in header, try body
             if not signature.get("emailAddress"):
@@ -1,13 +1,11 @@
 # db.py
 """
-Creates the SQLAlchemy engine and a scoped session factory.
+Creates the SQLAlchemy engine.
 Reads settings from .env (DATABASE_URL).
 """
 
 import os
-from contextlib import contextmanager
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import create_engine, make_url
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -16,28 +14,16 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 if not DATABASE_URL:
     raise RuntimeError("DATABASE_URL is not set in .env")
 
-# echo=True for SQL debug
-engine = create_engine(DATABASE_URL, pool_pre_ping=True, echo=False)
-
-# SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
-# db.py (where you build SessionLocal)
-SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, expire_on_commit=False)
+# Tag our connections with a program name so DBAs can spot (and kill) the scraper's load
+# in performance_schema.session_connect_attrs; each MySQL driver spells the option differently.
+DB_PROGRAM_NAME = os.getenv("DB_PROGRAM_NAME", "mailscraper")
+_driver = make_url(DATABASE_URL).drivername
+if _driver == "mysql+mysqlconnector":
+    connect_args = {"conn_attrs": {"program_name": DB_PROGRAM_NAME}}
+elif _driver == "mysql+pymysql":
+    connect_args = {"program_name": DB_PROGRAM_NAME}
+else:
+    connect_args = {}
 
-
-@contextmanager
-def session_scope():
-    """
-    Provide a transactional scope for a series of operations.
-    Commits on success; rolls back on exception.
-    """
-    session = SessionLocal()
-    try:
-        yield session
-        session.commit()
-        print("DB session committed")
-    except Exception:
-        session.rollback()
-        print("DB session rolled back")
-        raise
-    finally:
-        session.close()
+# echo=True for SQL debug
+engine = create_engine(DATABASE_URL, pool_pre_ping=True, echo=False, connect_args=connect_args)
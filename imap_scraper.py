@@ -1,67 +1,128 @@
 import imaplib
 from signature_extractor import ImprovedSignatureExtractor
-from email.header import decode_header, make_header
-from typing import List, Dict, Optional, Tuple,Iterable
+from typing import Callable, List, Dict, Optional, Tuple, Iterable, Iterator
 import email
+import hashlib
+from email import policy
+from email.header import decode_header, make_header
+from email.message import EmailMessage
+from email.parser import BytesParser
+import os
+import re
+import socket
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import partial
 
+# messages per FETCH; keeps the command line well under server request-size limits
+FETCH_BATCH_SIZE = 100
+
+# threads parsing MIME + extracting signatures while the IMAP socket is busy
+EXTRACT_WORKERS = int(os.getenv("EXTRACT_WORKERS", "4"))
+
+# only the headers we read plus the MIME ones needed to parse the body; PEEK keeps \Seen untouched
+FETCH_ITEMS = (
+    "(UID BODY.PEEK[HEADER.FIELDS (FROM SUBJECT MESSAGE-ID MIME-VERSION CONTENT-TYPE CONTENT-TRANSFER-ENCODING)]"
+    " BODY.PEEK[TEXT])"
+)
+
+# pooled IMAP connections idle longer than this are logged out instead of reused
+IMAP_IDLE_TTL = int(os.getenv("IMAP_IDLE_TTL", "300"))
+# most idle connections kept at once; least recently used are logged out first
+IMAP_POOL_SIZE = int(os.getenv("IMAP_POOL_SIZE", "32"))
+# resolved IMAP host addresses are reused for this long before asking DNS again
+DNS_CACHE_TTL = int(os.getenv("DNS_CACHE_TTL", "300"))
+DNS_CACHE_SIZE = 64
+
+_UID_RE = re.compile(rb"UID (\d+)")
+_FETCH_START_RE = re.compile(rb"\d+ \(")
+
+_PARSER = BytesParser(policy=policy.default)
 
-def _decode_header_value(value: Optional[str]) -> str:
-    if not value:
-        return ""
-    try:
-        return str(make_header(decode_header(value))).strip()
-    except Exception:
-        return value.strip()
 
-def _walk_parts_for_bodies(msg: email.message.Message) -> Tuple[Optional[str], Optional[str]]:
+def _join_sections(header: Optional[bytes], text: Optional[bytes]) -> bytes:
+    header = header or b""
+    if header and not header.endswith((b"\r\n\r\n", b"\n\n")):
+        header += b"\r\n"
+    return header + (text or b"")
+
+def _iter_fetch_response(data) -> Iterator[Tuple[Optional[int], bytes]]:
     """
-    Returns (html_body, text_body) as strings (or None). We don't set \Seen.
+    Walk a batched FETCH response and yield (uid, raw_message) per message.
+    imaplib returns one (envelope, literal) tuple per requested section and a
+    b')' chunk per message; a new message starts with "<seq> (". The header and
+    text sections are glued back together so the result parses as a message.
+    The UID normally sits in the first envelope but may also come after a literal.
     """
-    html_body = None
-    text_body = None
-
-    if msg.is_multipart():
-        for part in msg.walk():
-            ctype = (part.get_content_type() or "").lower()
-            if part.get_content_maintype() == "multipart":
-                continue
-            if part.get("Content-Disposition", "").lower().startswith("attachment"):
-                continue
+    started = False
+    uid, header, text = None, None, None
+    for item in data:
+        if isinstance(item, tuple):
+            envelope, literal = item
+            if _FETCH_START_RE.match(envelope):
+                if started:
+                    yield uid, _join_sections(header, text)
+                started = True
+                uid, header, text = None, None, None
+            if uid is None:
+                m = _UID_RE.search(envelope)
+                uid = int(m.group(1)) if m else None
+            if b"HEADER" in envelope:
+                header = literal
+            else:
+                text = literal
+        elif isinstance(item, bytes) and started and uid is None:
+            m = _UID_RE.search(item)
+            if m:
+                uid = int(m.group(1))
+    if started:
+        yield uid, _join_sections(header, text)
 
-            try:
-                payload = part.get_payload(decode=True)
-            except Exception:
-                payload = None
 
-            if not payload:
-                continue
+def _decode_header_value(value: Optional[str]) -> str:
+    # policy.default has already decoded RFC 2047 words (charset included); no second decode pass
+    if not value:
+        return ""
+    return str(value).strip()
 
-            charset = (part.get_content_charset() or "utf-8").strip("'\"").lower()
+def _header(msg: EmailMessage, name: str) -> str:
+    """
+    Decoded header value, or "" when absent. policy.default parses structured
+    headers on access and raises on malformed ones (e.g. "From: <"); fall back to
+    the raw value so one junk header does not fail the whole job.
+    """
+    try:
+        return _decode_header_value(msg.get(name))
+    except Exception:
+        pass
+    for key, raw in msg.raw_items():
+        if key.lower() == name.lower():
             try:
-                text = payload.decode(charset, errors="replace")
+                return str(make_header(decode_header(raw))).strip()
             except Exception:
-                # fallback if the declared charset is bogus
-                text = payload.decode("utf-8", errors="replace")
-
-            if ctype == "text/html" and html_body is None:
-                html_body = text
-            elif ctype == "text/plain" and text_body is None:
-                text_body = text
-    else:
-        # single-part message
-        payload = msg.get_payload(decode=True) or b""
-        charset = (msg.get_content_charset() or "utf-8").strip("'\"").lower()
-        try:
-            text = payload.decode(charset, errors="replace")
-        except Exception:
-            text = payload.decode("utf-8", errors="replace")
+                return str(raw).strip()
+    return ""
 
-        ctype = (msg.get_content_type() or "").lower()
-        if ctype == "text/html":
-            html_body = text
-        else:
-            text_body = text
+def _part_text(part: Optional[EmailMessage]) -> Optional[str]:
+    if part is None:
+        return None
+    try:
+        return part.get_content()
+    except (LookupError, UnicodeError):
+        # fallback if the declared charset is bogus
+        payload = part.get_payload(decode=True) or b""
+        return payload.decode("utf-8", errors="replace")
 
+def _walk_parts_for_bodies(msg: EmailMessage) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Returns (html_body, text_body) as strings (or None). We don't set \Seen.
+    Only the selected body parts are decoded; attachments are never touched.
+    """
+    html_body = _part_text(msg.get_body(preferencelist=("html",)))
+    text_body = _part_text(msg.get_body(preferencelist=("plain",)))
     return html_body, text_body
 
 def _html_to_text(html: str) -> str:
@@ -105,21 +166,169 @@ def _naive_signature_extract(body_text: str) -> Dict[str, Optional[str]]:
     }
 
 
+_dns_cache: "OrderedDict[Tuple[str, int], Tuple[float, List[tuple]]]" = OrderedDict()
+_dns_lock = threading.Lock()
+
+def _resolve(host: str, port: int) -> List[tuple]:
+    """Socket addresses for host:port, served from a small TTL'd LRU before hitting getaddrinfo."""
+    key = (host, port)
+    now = time.monotonic()
+    with _dns_lock:
+        hit = _dns_cache.get(key)
+        if hit and hit[0] > now:
+            _dns_cache.move_to_end(key)
+            return hit[1]
+    addrs = [sa for *_, sa in socket.getaddrinfo(host, port, 0, socket.SOCK_STREAM)]
+    with _dns_lock:
+        _dns_cache[key] = (now + DNS_CACHE_TTL, addrs)
+        _dns_cache.move_to_end(key)
+        while len(_dns_cache) > DNS_CACHE_SIZE:
+            _dns_cache.popitem(last=False)
+    return addrs
+
+def _forget(host: str, port: int):
+    with _dns_lock:
+        _dns_cache.pop((host, port), None)
+
+
+class CachedDNSIMAP4_SSL(imaplib.IMAP4_SSL):
+    """
+    IMAP4_SSL that connects to a cached address for the host. TLS is still
+    negotiated against the hostname, so SNI and certificate checks are unchanged.
+    """
+
+    def _create_socket(self, timeout):
+        if timeout is not None and not timeout:
+            raise ValueError('Non-blocking socket (timeout=0) is not supported')
+        last_err: Optional[OSError] = None
+        for sa in _resolve(self.host, self.port):
+            try:
+                if timeout is None:
+                    sock = socket.create_connection(sa[:2])
+                else:
+                    sock = socket.create_connection(sa[:2], timeout)
+                break
+            except OSError as e:
+                last_err = e
+        else:
+            # every cached address failed; resolve afresh on the next attempt
+            _forget(self.host, self.port)
+            raise last_err or OSError(f"no addresses for {self.host}")
+        return self.ssl_context.wrap_socket(sock, server_hostname=self.host)
+
+
+def _login(host: str, port: int, user: str, password: str) -> imaplib.IMAP4_SSL:
+    M = CachedDNSIMAP4_SSL(host, port)
+    M.login(user, password)
+    return M
+
+
+class IMAPPool:
+    """
+    Logged-in IMAP connections kept per (host, port, user, password digest), so
+    consecutive jobs for the same mailbox skip TLS + LOGIN. The digest is part of
+    the key so a caller only ever gets a session it could have logged in itself.
+    Bounded LRU; connections idle for idle_ttl seconds are logged out instead of
+    reused. A connection is only ever held by one caller at a time.
+    """
+
+    def __init__(
+        self,
+        idle_ttl: float = IMAP_IDLE_TTL,
+        max_size: int = IMAP_POOL_SIZE,
+        login: Callable[[str, int, str, str], imaplib.IMAP4_SSL] = _login,
+    ):
+        self.idle_ttl = idle_ttl
+        self.max_size = max_size
+        self._login = login
+        # (host, port, user, password digest) -> (connection, last used); least recently used first
+        self._idle: "OrderedDict[Tuple[str, int, str, bytes], Tuple[imaplib.IMAP4_SSL, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def session(self, host: str, port: int, user: str, password: str) -> Iterator[imaplib.IMAP4_SSL]:
+        """
+        Connection for this account for the duration of the block. Returned to
+        the pool when the block finishes cleanly; dropped if it raises.
+        """
+        M = self.get(host, port, user, password)
+        try:
+            yield M
+        except BaseException:
+            self._logout_quietly(M)
+            raise
+        self.release(self.key(host, port, user, password), M)
+
+    @staticmethod
+    def key(host: str, port: int, user: str, password: str) -> Tuple[str, int, str, bytes]:
+        return host, port, user, hashlib.sha256(password.encode()).digest()
+
+    def get(self, host: str, port: int, user: str, password: str) -> imaplib.IMAP4_SSL:
+        with self._lock:
+            entry = self._idle.pop(self.key(host, port, user, password), None)
+        if entry:
+            M, last_used = entry
+            if time.monotonic() - last_used < self.idle_ttl:
+                try:
+                    if M.noop()[0] == "OK":
+                        return M
+                except Exception:
+                    pass
+            self._logout_quietly(M)
+        # stale, dead or never pooled: fresh connect
+        return self._login(host, port, user, password)
+
+    def release(self, key: Tuple[str, int, str, bytes], M: imaplib.IMAP4_SSL):
+        try:
+            # unselect (CLOSE also expunges messages flagged \Deleted in a read-write mailbox)
+            if M.state == "SELECTED":
+                M.close()
+        except Exception:
+            self._logout_quietly(M)
+            return
+        evicted = []
+        with self._lock:
+            previous = self._idle.pop(key, None)
+            if previous:
+                evicted.append(previous[0])
+            self._idle[key] = (M, time.monotonic())
+            while len(self._idle) > self.max_size:
+                evicted.append(self._idle.popitem(last=False)[1][0])
+        for old in evicted:
+            self._logout_quietly(old)
+
+    def close_idle(self):
+        """Log out pooled connections idle for idle_ttl seconds or more."""
+        now = time.monotonic()
+        with self._lock:
+            expired = [key for key, (_, last_used) in self._idle.items() if now - last_used >= self.idle_ttl]
+            stale = [self._idle.pop(key)[0] for key in expired]
+        for M in stale:
+            self._logout_quietly(M)
+
+    def close_all(self):
+        with self._lock:
+            conns = [M for M, _ in self._idle.values()]
+            self._idle.clear()
+        for M in conns:
+            self._logout_quietly(M)
+
+    @staticmethod
+    def _logout_quietly(M: imaplib.IMAP4_SSL):
+        try:
+            M.logout()
+        except Exception:
+            pass
+
+
 class IMAPScraper:
     def __init__(self):
         self.extractor = ImprovedSignatureExtractor()
+        self._workers = ThreadPoolExecutor(max_workers=EXTRACT_WORKERS, thread_name_prefix="sig-extract")
+        self.pool = IMAPPool()
 
     def _decode_subject(self, msg) -> str | None:
-        if not msg["Subject"]:
-            return None
-        subject_parts = decode_header(msg["Subject"])
-        pieces = []
-        for part, encoding in subject_parts:
-            if isinstance(part, bytes):
-                pieces.append(part.decode(encoding or "utf-8", errors="ignore"))
-            else:
-                pieces.append(str(part))
-        return "".join(pieces) if pieces else None
+        return _header(msg, "Subject") or None
 
     def fetch_signatures(
         self,
@@ -138,13 +347,33 @@ class IMAPScraper:
             emailAddress, companyName, jobTitle, phoneNumber, address, website,
             firstName, lastName }
         """
-        # login with the host/port you passed from the DB job
-        M = self._login(imap_host, imap_port, user_email, password)
-        try:
-            typ, _ = M.select(mailbox, readonly=True)
-            if typ != "OK":
-                return []
+        # login with the host/port you passed from the DB job (reused if the pool still holds one)
+        with self.pool.session(imap_host, imap_port, user_email, password) as M:
+            return self.fetch_signatures_with(M, mailbox, search, max_messages, extractor)
+
+    def fetch_signatures_with(
+        self,
+        M: imaplib.IMAP4_SSL,
+        mailbox: str = "INBOX",
+        search: str = "ALL",
+        max_messages: int = 200,
+        extractor=None,
+    ) -> List[Dict]:
+        """fetch_signatures over a connection the caller already holds (e.g. from IMAPPool.session)."""
+        typ, data = M.select(mailbox, readonly=True)
+        if typ != "OK":
+            return []
 
+        if search == "ALL" and max_messages and max_messages > 0:
+            # newest N straight from the EXISTS count; skips a SEARCH that lists every UID
+            total = int(data[0] or 0)
+            first = max(1, total - max_messages + 1)
+            msg_sets = [
+                f"{lo}:{min(lo + FETCH_BATCH_SIZE - 1, total)}"
+                for lo in range(first, total + 1, FETCH_BATCH_SIZE)
+            ]
+            fetch = M.fetch
+        else:
             # use UID so we can delete later by UID
             typ, data = M.uid("SEARCH", None, search)
             if typ != "OK" or not data or not data[0]:
@@ -153,77 +382,72 @@ class IMAPScraper:
             uids = data[0].split()
             if max_messages and max_messages > 0:
                 uids = uids[-max_messages:]
+            msg_sets = [b",".join(uids[i:i + FETCH_BATCH_SIZE]) for i in range(0, len(uids), FETCH_BATCH_SIZE)]
+            fetch = partial(M.uid, "FETCH")
 
-            out: List[Dict] = []
-            for uid in uids:
-                typ, msg_data = M.uid("FETCH", uid, "(BODY.PEEK[] RFC822.HEADER)")
-                if typ != "OK" or not msg_data or not isinstance(msg_data[0], tuple):
-                    continue
+        use_extractor = extractor or self.extractor
+        # parsing/extraction runs on the worker pool while this thread keeps fetching
+        futures: List[Future] = []
+        # one FETCH per batch instead of one round-trip per message
+        for msg_set in msg_sets:
+            typ, msg_data = fetch(msg_set, FETCH_ITEMS)
+            if typ != "OK" or not msg_data:
+                continue
 
-                raw = msg_data[0][1]
-                if not raw:
+            for uid, raw in _iter_fetch_response(msg_data):
+                if uid is None or not raw:
                     continue
+                futures.append(self._workers.submit(self._parse_message, uid, raw, mailbox, use_extractor))
 
-                msg = email.message_from_bytes(raw)
+        return [f.result() for f in futures]
 
-                from_hdr   = _decode_header_value(msg.get("From"))
-                subject    = _decode_header_value(msg.get("Subject"))
-                message_id = (msg.get("Message-ID") or msg.get("Message-Id") or msg.get("Message-id") or "").strip() or None
+    def _parse_message(self, uid: int, raw: bytes, mailbox: str, use_extractor) -> Dict:
+        msg = _PARSER.parsebytes(raw)
 
-                html_body, text_body = _walk_parts_for_bodies(msg)
-                body_text = text_body or (_html_to_text(html_body) if html_body else "")
+        from_hdr   = _header(msg, "From")
+        subject    = _header(msg, "Subject")
+        message_id = _header(msg, "Message-ID") or None
 
-                # prefer the improved extractor; fall back to naive
-                parsed: Dict[str, Optional[str]] = {}
-                try:
-                    use_extractor = extractor or self.extractor
-                    if hasattr(use_extractor, "extract_signature"):
-                        # our ImprovedSignatureExtractor API
-                        parsed = use_extractor.extract_signature(
-                            raw_body=html_body or body_text,
-                            sender_header=from_hdr or None,
-                        ) or {}
-                    elif hasattr(use_extractor, "extract_from_email"):
-                        # legacy/custom API
-                        from_name, from_addr = email.utils.parseaddr(from_hdr)
-                        parsed = use_extractor.extract_from_email(
-                            html=html_body,
-                            text=body_text,
-                            from_name=from_name or None,
-                            from_addr=from_addr or None,
-                            subject=subject or None,
-                        ) or {}
-                except Exception:
-                    parsed = {}
-
-                if not parsed:
-                    parsed = _naive_signature_extract(body_text)
+        html_body, text_body = _walk_parts_for_bodies(msg)
+        body_text = text_body or (_html_to_text(html_body) if html_body else "")
 
-                out.append({
-                    "uid": int(uid),
-                    "messageId": message_id,
-                    "mailbox": mailbox,
-                    **parsed,
-                })
+        # prefer the improved extractor; fall back to naive
+        parsed: Dict[str, Optional[str]] = {}
+        try:
+            if hasattr(use_extractor, "extract_signature"):
+                # our ImprovedSignatureExtractor API
+                parsed = use_extractor.extract_signature(
+                    raw_body=html_body or body_text,
+                    sender_header=from_hdr or None,
+                    is_html=bool(html_body),
+                ) or {}
+            elif hasattr(use_extractor, "extract_from_email"):
+                # legacy/custom API
+                from_name, from_addr = email.utils.parseaddr(from_hdr)
+                parsed = use_extractor.extract_from_email(
+                    html=html_body,
+                    text=body_text,
+                    from_name=from_name or None,
+                    from_addr=from_addr or None,
+                    subject=subject or None,
+                ) or {}
+        except Exception:
+            parsed = {}
 
-            return out
-        finally:
-            try:
-                M.close()
-            except Exception:
-                pass
-            M.logout()
+        if not parsed:
+            parsed = _naive_signature_extract(body_text)
 
-    def _login(self, host: str, port: int, user: str, password: str) -> imaplib.IMAP4_SSL:
-        M = imaplib.IMAP4_SSL(host, port)
-        M.login(user, password)
-        return M
+        return {
+            "uid": uid,
+            "messageId": message_id,
+            "mailbox": mailbox,
+            **parsed,
+        }
 
     def delete_by_uid(self, host: str, port: int, user: str, password: str, mailbox: str, uids: Iterable[int]) -> int:
         if not uids:
             return 0
-        M = self._login(host, port, user, password)
-        try:
+        with self.pool.session(host, port, user, password) as M:
             M.select(mailbox or "INBOX")
             # mark each UID as \Deleted
             for uid in uids:
@@ -231,17 +455,12 @@ class IMAPScraper:
             # expunge once per mailbox batch
             M.expunge()
             return len(list(uids))
-        finally:
-            try: M.close()
-            except: pass
-            M.logout()
 
     def delete_by_message_id(self, host: str, port: int, user: str, password: str, mailbox: str, message_ids: Iterable[str]) -> int:
         if not message_ids:
             return 0
-        M = self._login(host, port, user, password)
         deleted = 0
-        try:
+        with self.pool.session(host, port, user, password) as M:
             M.select(mailbox or "INBOX")
             for mid in message_ids:
                 # Search by exact Message-ID (quotes required)
@@ -251,8 +470,4 @@ class IMAPScraper:
                         M.store(msg_id, "+FLAGS", r"(\Deleted)")
                         deleted += 1
             M.expunge()
-            return deleted
-        finally:
-            try: M.close()
-            except: pass
-            M.logout()
\ No newline at end of file
+            return deleted
\ No newline at end of file
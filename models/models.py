@@ -11,7 +11,7 @@ Status semantics for EmailFetchRequest:
 
 from datetime import datetime
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
-from sqlalchemy import String, Integer, Text, DateTime, ForeignKey ,Boolean
+from sqlalchemy import String, Integer, Text, DateTime, ForeignKey ,Boolean, Index
 
 class Base(DeclarativeBase):
     pass
@@ -25,6 +25,9 @@ class Customers(Base):
 
 class EmailFetchRequest(Base):
     __tablename__ = "email_scraping_requests"
+    # serves pick_pending_jobs (WHERE status=0 ORDER BY id) straight from the index.
+    # existing DBs: CREATE INDEX ix_esr_status_id ON email_scraping_requests (status, id);
+    __table_args__ = (Index("ix_esr_status_id", "status", "id"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
 
@@ -35,7 +38,7 @@ class EmailFetchRequest(Base):
     imap_port: Mapped[int] = mapped_column(Integer, default=993)
     max_messages: Mapped[int] = mapped_column(Integer, default=10)
 
-    status: Mapped[int] = mapped_column(Integer, default=0, index=True)  # 0=pending,2=running,1=done,-1=failed
+    status: Mapped[int] = mapped_column(Integer, default=0)  # 0=pending,2=running,1=done,-1=failed
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     created_by: Mapped[int] = mapped_column(ForeignKey("customers.cus_id"), index=True)
 
@@ -70,7 +73,9 @@ class SignatureResult(Base):
         # server_default=sa.text("0"),  # uncomment in migration for MySQL
     )
 
-    created_date: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    # indexed for the retention DELETE (created_date < cutoff) in service.cleanup_old_results.
+    # existing DBs: CREATE INDEX ix_temp_mail_created_date ON temp_mail (created_date);
+    created_date: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, index=True)
     created_by: Mapped[int] = mapped_column(ForeignKey("customers.cus_id"), index=True)
 
     request: Mapped[EmailFetchRequest] = relationship(back_populates="results")
@@ -1,18 +1,24 @@
 import os
+import re
 import sys
-import time
+import selectors
 import signal
-from typing import Sequence
+import socket
+import threading
+from dataclasses import dataclass
+from contextlib import contextmanager
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Iterator
 from datetime import datetime, timedelta
 
 # Ensure local imports work when running "python service.py"
 sys.path.append(os.path.dirname(__file__))
 
 from dotenv import load_dotenv
-from sqlalchemy import select, update, delete
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy import Connection, select, update, delete, insert, text
+from sqlalchemy.exc import DBAPIError, SQLAlchemyError
 
-from db import session_scope  # your SessionLocal context manager
+from db import engine
 from models.models import EmailFetchRequest, SignatureResult  # your models
 from imap_scraper import IMAPScraper  # your IMAP logic
 
@@ -21,74 +27,161 @@ from imap_scraper import IMAPScraper  # your IMAP logic
 # -------------------------
 load_dotenv()
 
-POLL_SECONDS = int(os.getenv("POLL_SECONDS", "60"))               # how often to look for new jobs
+POLL_SECONDS = int(os.getenv("POLL_SECONDS", "60"))               # base poll interval; adapts between /8 (busy) and x4 (idle)
 MAX_JOBS_PER_CYCLE = int(os.getenv("MAX_JOBS_PER_CYCLE", "0"))    # 0 = no cap
 RETENTION_DAYS = int(os.getenv("RESULT_RETENTION_DAYS", "3"))     # cleanup window for SignatureResult
+CONCURRENCY = int(os.getenv("CONCURRENCY", "8"))                  # jobs (mailboxes) processed in parallel
+INSERT_PAGE_SIZE = int(os.getenv("INSERT_PAGE_SIZE", "1000"))     # rows per multi-row INSERT
+CLEANUP_CHUNK_SIZE = int(os.getenv("CLEANUP_CHUNK_SIZE", "10000"))  # rows per retention DELETE
+PERSIST_EVERY = int(os.getenv("PERSIST_EVERY", str(CONCURRENCY)))  # finished jobs per batched write
 
 # -------------------------
 # Globals
 # -------------------------
 scraper = IMAPScraper()
-_shutdown = False
+# jobs are dominated by IMAP network waits, so threads overlap them well
+_job_pool = ThreadPoolExecutor(max_workers=CONCURRENCY, thread_name_prefix="job")
+# set once by SIGINT/SIGTERM; checked between jobs and cycles
+_shutdown_evt = threading.Event()
 _last_cleanup: datetime | None = None
+# self-pipe: the interpreter writes a byte to _wake_w from the C-level handler of
+# every signal, so the idle select() returns the moment SIGTERM/SIGINT/SIGUSR1 lands.
+# A socketpair rather than os.pipe because Windows only selects on sockets.
+_wake_r, _wake_w = socket.socketpair()
+_wake_r.setblocking(False)
+_wake_w.setblocking(False)
+_selector = selectors.DefaultSelector()
+_selector.register(_wake_r, selectors.EVENT_READ)
 
 
 def handle_sigterm(signum, frame):
     """Graceful shutdown on Ctrl+C / SIGTERM."""
-    global _shutdown
-    _shutdown = True
+    _shutdown_evt.set()
     print("[SYS] Received shutdown signal. Exiting gracefully...")
 
 
+def handle_wakeup(signum, frame):
+    """
+    SIGUSR1 from whatever queued a job (e.g. `pkill -USR1 -f service.py`): poll now.
+    Nothing to do here; the wakeup fd byte already ended the idle wait.
+    """
+
+
+def wait_for_work(timeout: float):
+    """
+    Idle until the next poll is due, or until a signal arrives. MySQL has no
+    LISTEN/NOTIFY, so the timed poll stays as the fallback for un-signalled inserts.
+    """
+    if _selector.select(timeout):
+        try:
+            while _wake_r.recv(4096):
+                pass
+        except BlockingIOError:
+            pass  # drained
+
+
+signal.set_wakeup_fd(_wake_w.fileno())
 signal.signal(signal.SIGINT, handle_sigterm)
 signal.signal(signal.SIGTERM, handle_sigterm)
+if hasattr(signal, "SIGUSR1"):  # not on Windows
+    signal.signal(signal.SIGUSR1, handle_wakeup)
+
+
+# -------------------------
+# DB connection
+# -------------------------
+# Only the loop thread touches the DB (workers just do IMAP), so it holds one
+# connection for the life of the process instead of a pool checkout + pre-ping
+# per helper; each helper is one transaction on it.
+_conn: Connection | None = None
+
+
+@contextmanager
+def db_tx() -> Iterator[Connection]:
+    """One transaction on the service connection. Commits on success; rolls back on exception."""
+    global _conn
+    if _conn is None or _conn.closed or _conn.invalidated:
+        if _conn is not None:
+            _conn.close()
+        _conn = engine.connect()
+    try:
+        with _conn.begin():
+            yield _conn
+    except DBAPIError as e:
+        if e.connection_invalidated:
+            # server went away (wait_timeout, restart, failover): reconnect on the next call
+            _conn.close()
+            _conn = None
+        raise
+
+
+def close_db():
+    global _conn
+    if _conn is not None:
+        _conn.close()
+        _conn = None
 
 
 # -------------------------
 # Persistence helpers
 # -------------------------
-def pick_pending_jobs(limit: int | None = None) -> Sequence[EmailFetchRequest]:
+@dataclass(slots=True)
+class Job:
+    """The columns of a claimed email_scraping_requests row that a job run uses."""
+    id: int
+    email: str
+    password: str
+    imap_host: str
+    imap_port: int
+    max_messages: int
+    created_by: int
+
+
+def pick_pending_jobs(limit: int | None = None) -> list[Job]:
     """
-    Fetch pending jobs (status=0) ordered by id ascending.
-    Detached from session for safe use outside with-block.
+    Claim pending jobs (status=0 -> 2) ordered by id ascending, in one transaction.
+    Rows are locked with FOR UPDATE SKIP LOCKED so concurrent workers never
+    claim the same job; what we return has already been marked running.
+    MySQL has no UPDATE ... RETURNING, so lock-then-update is the one-transaction
+    equivalent: two statements, one commit, no window for another worker.
+    Returns plain Job snapshots, usable after the commit; nothing is re-read later.
     """
-    with session_scope() as s:
-        stmt = select(EmailFetchRequest).where(EmailFetchRequest.status == 0).order_by(EmailFetchRequest.id.asc())
+    with db_tx() as conn:
+        t = EmailFetchRequest.__table__.c
+        # just what a job run needs
+        stmt = (
+            # column order matches Job's fields
+            select(t.id, t.email, t.password, t.imap_host, t.imap_port, t.max_messages, t.created_by)
+            .where(t.status == 0)
+            .order_by(t.id.asc())
+            .with_for_update(skip_locked=True)
+        )
         if limit and limit > 0:
             stmt = stmt.limit(limit)
-        jobs = s.execute(stmt).scalars().all()
-        # detach
-        for j in jobs:
-            s.expunge(j)
+        jobs = [Job(*row) for row in conn.execute(stmt)]
+        if jobs:
+            conn.execute(
+                update(EmailFetchRequest.__table__)
+                .where(t.id.in_([j.id for j in jobs]))
+                .values(status=2)
+            )
         return jobs
 
 
-def mark_running(job_id: int) -> bool:
-    """
-    Mark job as running (2) only if it is still pending (0).
-    Returns True if we actually updated a row (race-safe).
-    """
-    with session_scope() as s:
-        res = s.execute(
-            update(EmailFetchRequest)
-            .where(EmailFetchRequest.id == job_id, EmailFetchRequest.status == 0)
-            .values(status=2)
-        )
-        return res.rowcount and res.rowcount > 0
-
-
-def mark_done(job_id: int):
-    with session_scope() as s:
-        s.execute(
+def mark_done(job: Job, results: list[dict]):
+    """Save the job's signatures and flip it to done (1) in a single commit."""
+    with db_tx() as conn:
+        save_results(conn, job, results)
+        conn.execute(
             update(EmailFetchRequest)
-            .where(EmailFetchRequest.id == job_id)
+            .where(EmailFetchRequest.id == job.id)
             .values(status=1)
         )
 
 
 def mark_failed(job_id: int, error_msg: str):
-    with session_scope() as s:
-        s.execute(
+    with db_tx() as conn:
+        conn.execute(
             update(EmailFetchRequest)
             .where(EmailFetchRequest.id == job_id)
             .values(status=-1)
@@ -97,67 +190,116 @@ def mark_failed(job_id: int, error_msg: str):
         # Left out because your provided model doesn't include last_error.
 
 
-def save_results(job_id: int, results: list[dict]):
+def release_jobs(job_ids: list[int]):
     """
-    Persist extracted signatures to SignatureResult, copying created_by
-    from the parent EmailFetchRequest.
+    Hand claimed jobs whose outcome was never written back to the queue (2 -> 0),
+    e.g. on shutdown or when a batch write failed. The status guard leaves alone
+    any row that did get marked done/failed.
     """
-    if not results:
+    if not job_ids:
         return
+    with db_tx() as conn:
+        conn.execute(
+            update(EmailFetchRequest.__table__)
+            .where(EmailFetchRequest.id.in_(job_ids), EmailFetchRequest.status == 2)
+            .values(status=0)
+        )
+    print(f"[SYS] Released {len(job_ids)} unfinished job(s) back to pending.")
+
+
+def requeue_stale_jobs():
+    """
+    Startup sweep: return every running (2) row to pending. Assumes one service
+    instance, so at startup any such row was left behind by a run that crashed
+    or was killed before it could write the job's outcome.
+    """
+    with db_tx() as conn:
+        n = conn.execute(
+            update(EmailFetchRequest.__table__)
+            .where(EmailFetchRequest.status == 2)
+            .values(status=0)
+        ).rowcount or 0
+    if n:
+        print(f"[SYS] Requeued {n} job(s) left running by a previous run.")
+
+
+def save_results(conn: Connection, job: Job, results: list[dict]):
+    """
+    Persist extracted signatures to SignatureResult, stamped with the parent
+    EmailFetchRequest's created_by (taken from the claimed job, no re-read).
+    Runs inside the caller's transaction.
+    """
+    insert_result_rows(conn, result_rows(job, results))
+
+
+def result_rows(job: Job, results: list[dict]) -> list[dict]:
+    """SignatureResult column values for one job's extracted signatures."""
+    return [
+        dict(
+            request_id=job.id,
+            created_by=job.created_by,  # ✅ propagate created_by from parent
+            message_uid=r.get("uid"),
+            message_id=r.get("messageId"),
+            mailbox=r.get("mailbox") or "INBOX",
+            email=r.get("emailAddress"),
+            company_name=r.get("companyName"),
+            job_title=r.get("jobTitle"),
+            phone=r.get("phoneNumber"),
+            address=r.get("address"),
+            website=r.get("website"),
+            first_name=r.get("firstName"),
+            last_name=r.get("lastName"),
+            is_deleted=False,
+        )
+        for r in results
+    ]
+
+
+def insert_result_rows(conn: Connection, rows: list[dict]):
+    """
+    Multi-row INSERTs instead of an ORM object + flush per signature. mysqlconnector
+    rewrites each executemany into one INSERT ... VALUES (...), (...); paging keeps
+    that statement under max_allowed_packet for very large batches.
+    """
+    if not rows:
+        return
+    # the Table, not the mapped class: a plain Core INSERT with no ORM bulk-insert handling
+    stmt = insert(SignatureResult.__table__)
+    for i in range(0, len(rows), INSERT_PAGE_SIZE):
+        conn.execute(stmt, rows[i:i + INSERT_PAGE_SIZE])
 
-    with session_scope() as s:
-        # Load the parent to grab created_by
-        req = s.get(EmailFetchRequest, job_id)
-        if not req:
-            print(f"[WARN] EmailFetchRequest id={job_id} not found; skipping save.")
-            return
-        
-        for r in results:
-            row = SignatureResult(
-                request_id=job_id,
-                created_by=req.created_by,  # ✅ propagate created_by from parent
-                message_uid=r.get("uid"),
-                message_id=r.get("messageId"),
-                mailbox=r.get("mailbox") or "INBOX",
-                email=r.get("emailAddress"),
-                company_name=r.get("companyName"),
-                job_title=r.get("jobTitle"),
-                phone=r.get("phoneNumber"),
-                address=r.get("address"),
-                website=r.get("website"),
-                first_name=r.get("firstName"),
-                last_name=r.get("lastName"),
-                is_deleted=False
-            )
-            s.add(row)
 
 def purge_deleted_results():
     print("[PURGE] Checking for messages to delete...")
 
     # Step 1: read everything we need first
-    with session_scope() as s:
+    with db_tx() as conn:
         rows = (
-            s.execute(
-                select(SignatureResult, EmailFetchRequest)
+            conn.execute(
+                select(
+                    SignatureResult.id, SignatureResult.mailbox, SignatureResult.message_uid, SignatureResult.message_id,
+                    EmailFetchRequest.id.label("req_id"), EmailFetchRequest.imap_host, EmailFetchRequest.imap_port,
+                    EmailFetchRequest.email, EmailFetchRequest.password,
+                )
                 .join(EmailFetchRequest, SignatureResult.request_id == EmailFetchRequest.id)
                 .where(SignatureResult.is_deleted == True)  # noqa: E712
             )
             .all()
         )
 
-        payload = []
-        for sig, req in rows:
-            payload.append({
-                "sig_id": sig.id,
-                "req_id": req.id,
-                "mailbox": sig.mailbox or "INBOX",
-                "host": req.imap_host,
-                "port": req.imap_port or 993,
-                "user": req.email,
-                "password": req.password,
-                "uid": sig.message_uid,
-                "mid": sig.message_id,
-            })
+    payload = []
+    for row in rows:
+        payload.append({
+            "sig_id": row.id,
+            "req_id": row.req_id,
+            "mailbox": row.mailbox or "INBOX",
+            "host": row.imap_host,
+            "port": row.imap_port or 993,
+            "user": row.email,
+            "password": row.password,
+            "uid": row.message_uid,
+            "mid": row.message_id,
+        })
 
     if not payload:
         print("[PURGE] Nothing to delete.")
@@ -185,36 +327,33 @@ def purge_deleted_results():
 
     # Step 3: delete successfully purged rows from DB
     if deleted_sig_ids:
-        with session_scope() as s:
-            s.query(SignatureResult).filter(SignatureResult.id.in_(deleted_sig_ids)).delete(synchronize_session=False)
+        with db_tx() as conn:
+            conn.execute(delete(SignatureResult).where(SignatureResult.id.in_(deleted_sig_ids)))
         print(f"[PURGE] Deleted {len(deleted_sig_ids)} rows from DB")
 
 
 # -------------------------
 # Job processing
 # -------------------------
-def process_job(job: EmailFetchRequest):
-    """
-    Run one job: mark running, fetch via IMAP, save results, mark done.
-    Handles exceptions and marks failed.
-    """
+def fetch_job(job: Job) -> list[dict]:
+    """IMAP half of a job; touches no DB, so it can run on a worker thread."""
     print(f"[JOB {job.id}] Start — {job.email} @ {job.imap_host}:{job.imap_port} (max={job.max_messages})")
+    return scraper.fetch_signatures(
+        user_email=job.email,
+        password=job.password,
+        imap_host=job.imap_host,
+        imap_port=job.imap_port or 993,
+        max_messages=job.max_messages or 10,
+    )
 
-    # Attempt to acquire "lock" by transitioning 0 -> 2.
-    if not mark_running(job.id):
-        print(f"[JOB {job.id}] Skipped — not pending anymore (possibly picked by another worker).")
-        return
 
+def complete_job(job: Job, results: list[dict]):
+    """
+    DB half of a single job, for when a batched write failed: save results and
+    mark done in one transaction, or mark failed if the save raised.
+    """
     try:
-        results = scraper.fetch_signatures(
-            user_email=job.email,
-            password=job.password,
-            imap_host=job.imap_host,
-            imap_port=job.imap_port or 993,
-            max_messages=job.max_messages or 10,
-        )
-        save_results(job.id, results)
-        mark_done(job.id)
+        mark_done(job, results)
         print(f"[JOB {job.id}] Done — saved {len(results)} signature(s).")
     except Exception as e:
         err = f"{type(e).__name__}: {e}"
@@ -222,6 +361,104 @@ def process_job(job: EmailFetchRequest):
         mark_failed(job.id, err)
 
 
+def run_jobs(limit: int | None = None) -> int:
+    """
+    One cycle of pending jobs on the worker pool (mailbox I/O overlaps across jobs).
+    Jobs are claimed only as worker slots free up, so at most CONCURRENCY jobs plus
+    one unwritten batch are ever at running (2); claiming stops once the queue is
+    drained, `limit` jobs were claimed, or shutdown is requested. Outcomes are written
+    from this thread, the only one touching the DB, in batches of PERSIST_EVERY
+    finished jobs, so a slow mailbox doesn't hold back everyone else's results.
+    Anything claimed but not written (shutdown, an exception escaping the loop) goes
+    back to pending. Returns the number of jobs claimed.
+    """
+    claimed = 0
+    drained = False
+    done: list[tuple[Job, list[dict]]] = []
+    failed: list[tuple[Job, str]] = []
+    unstarted: list[int] = []
+    futures: dict[Future, Job] = {}
+    try:
+        while True:
+            free = CONCURRENCY - len(futures)
+            if limit:
+                free = min(free, limit - claimed)
+            if free > 0 and not drained and not _shutdown_evt.is_set():
+                jobs = pick_pending_jobs(limit=free)
+                drained = len(jobs) < free
+                claimed += len(jobs)
+                futures.update((_job_pool.submit(_fetch_unless_shutdown, job), job) for job in jobs)
+            if not futures:
+                break
+            finished, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for fut in finished:
+                # drop our reference so a persisted job's results can be freed
+                job = futures.pop(fut)
+                try:
+                    results = fut.result()
+                except Exception as e:
+                    err = f"{type(e).__name__}: {e}"
+                    print(f"[JOB {job.id}] FAILED — {err}")
+                    failed.append((job, err))
+                    continue
+                if results is None:  # not started before shutdown
+                    unstarted.append(job.id)
+                else:
+                    done.append((job, results))
+            if len(done) + len(failed) >= max(PERSIST_EVERY, 1):
+                persist_cycle(done, failed)
+                done, failed = [], []
+        persist_cycle(done, failed)
+        done, failed = [], []
+    finally:
+        # let fetches still in progress finish first, so none is requeued while it runs
+        wait(futures)
+        release_jobs(
+            unstarted
+            + [job.id for job in futures.values()]
+            + [job.id for job, _ in done]
+            + [job.id for job, _ in failed]
+        )
+    return claimed
+
+
+def persist_cycle(done: list[tuple[Job, list[dict]]], failed: list[tuple[Job, str]]):
+    """
+    One transaction for a batch of finished jobs: a single (paged) INSERT of every
+    job's signatures and one status UPDATE each for the done and failed ids. If that
+    fails, fall back to per-job writes so one bad job can't sink the rest.
+    """
+    if not (done or failed):
+        return
+    rows = [row for job, results in done for row in result_rows(job, results)]
+
+    try:
+        with db_tx() as conn:
+            insert_result_rows(conn, rows)
+            if done:
+                conn.execute(
+                    update(EmailFetchRequest.__table__)
+                    .where(EmailFetchRequest.id.in_([job.id for job, _ in done]))
+                    .values(status=1)
+                )
+            if failed:
+                conn.execute(
+                    update(EmailFetchRequest.__table__)
+                    .where(EmailFetchRequest.id.in_([job.id for job, _ in failed]))
+                    .values(status=-1)
+                )
+    except Exception as e:
+        print(f"[CYCLE] Batched write failed ({type(e).__name__}: {e}); saving job by job.")
+        for job, results in done:
+            complete_job(job, results)
+        for job, err in failed:
+            mark_failed(job.id, err)
+        return
+
+    for job, results in done:
+        print(f"[JOB {job.id}] Done — saved {len(results)} signature(s).")
+
+
 # -------------------------
 # Daily cleanup
 # -------------------------
@@ -232,11 +469,87 @@ def cleanup_old_results():
     cutoff = datetime.utcnow() - timedelta(days=RETENTION_DAYS)
     print(f"[CLEANUP] Removing SignatureResult older than {RETENTION_DAYS} day(s) (cutoff: {cutoff:%Y-%m-%d %H:%M:%S} UTC)")
 
-    with session_scope() as s:
-        stmt = delete(SignatureResult).where(SignatureResult.created_date < cutoff)
-        result = s.execute(stmt)
-        deleted = result.rowcount or 0
-        print(f"[CLEANUP] Deleted {deleted} record(s).")
+    with db_tx() as conn:
+        dropped = rotate_partitions(conn, cutoff)
+        if dropped:
+            print(f"[CLEANUP] Dropped {dropped} daily partition(s).")
+
+    # unpartitioned tables, plus the part of the cutoff day a partition drop can't take.
+    # DELETE ... LIMIT in separate commits keeps each transaction's locks and undo log bounded
+    stmt = (
+        delete(SignatureResult)
+        .where(SignatureResult.created_date < cutoff)
+        .with_dialect_options(mysql_limit=CLEANUP_CHUNK_SIZE)
+    )
+    deleted = 0
+    while True:
+        with db_tx() as conn:
+            n = conn.execute(stmt).rowcount or 0
+        deleted += n
+        if n < CLEANUP_CHUNK_SIZE or _shutdown_evt.is_set():
+            break
+    print(f"[CLEANUP] Deleted {deleted} record(s).")
+
+
+_PARTITION_RE = re.compile(r"^p(\d{8})$")
+
+def rotate_partitions(conn: Connection, cutoff: datetime) -> int | None:
+    """
+    Retention by DDL when temp_mail is partitioned by day, i.e. set up as
+        PARTITION BY RANGE COLUMNS(created_date) (
+            PARTITION pYYYYMMDD VALUES LESS THAN ('<next day>'), ...,
+            PARTITION pmax VALUES LESS THAN (MAXVALUE))
+    MySQL rejects that layout unless temp_mail has no foreign keys (drop them first)
+    and every unique key, the primary key included, contains created_date:
+        ALTER TABLE temp_mail DROP PRIMARY KEY, ADD PRIMARY KEY (id, created_date);
+    (id keeps AUTO_INCREMENT, since it still leads the new primary key.)
+    Splits today's and tomorrow's partitions off pmax and drops every day that ends
+    before cutoff, which is a metadata operation instead of a row-by-row DELETE.
+    Returns the number of partitions dropped, or None if the table isn't laid out this way.
+    """
+    if conn.dialect.name != "mysql":
+        return None
+    table = SignatureResult.__tablename__
+    names = conn.execute(
+        text(
+            "SELECT PARTITION_NAME FROM information_schema.PARTITIONS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :t AND PARTITION_NAME IS NOT NULL"
+        ),
+        {"t": table},
+    ).scalars().all()
+    if "pmax" not in names:
+        return None
+
+    days = {datetime.strptime(m.group(1), "%Y%m%d") for m in map(_PARTITION_RE.match, names) if m}
+    today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    for day in (today, today + timedelta(days=1)):
+        # new ranges can only be split off the top (pmax)
+        if not days or day > max(days):
+            conn.execute(text(
+                f"ALTER TABLE {table} REORGANIZE PARTITION pmax INTO ("
+                f"PARTITION p{day:%Y%m%d} VALUES LESS THAN ('{day + timedelta(days=1):%Y-%m-%d}'), "
+                f"PARTITION pmax VALUES LESS THAN (MAXVALUE))"
+            ))
+            days.add(day)
+
+    expired = sorted(day for day in days if day + timedelta(days=1) <= cutoff)
+    if expired:
+        conn.execute(text(f"ALTER TABLE {table} DROP PARTITION " + ", ".join(f"p{day:%Y%m%d}" for day in expired)))
+    return len(expired)
+
+
+def poll_delay(idle_streak: int) -> float:
+    """
+    Seconds until the next poll: POLL_SECONDS/8 right after a cycle that found work,
+    doubling per consecutive idle cycle up to POLL_SECONDS*4.
+    """
+    return POLL_SECONDS * 2 ** min(idle_streak, 5) / 8
+
+
+def _fetch_unless_shutdown(job: Job) -> list[dict] | None:
+    if _shutdown_evt.is_set():
+        return None
+    return fetch_job(job)
 
 
 # -------------------------
@@ -246,39 +559,43 @@ def main():
     global _last_cleanup
 
     print("[SYS] MailScraper service started.")
-    print(f"[SYS] Poll every {POLL_SECONDS}s | Max jobs/cycle: {MAX_JOBS_PER_CYCLE or '∞'} | Retention: {RETENTION_DAYS} day(s)")
+    print(f"[SYS] Poll every {POLL_SECONDS / 8:g}-{POLL_SECONDS * 4}s (adaptive) | Max jobs/cycle: {MAX_JOBS_PER_CYCLE or '∞'} | Concurrency: {CONCURRENCY} | Retention: {RETENTION_DAYS} day(s)")
 
     # First cleanup on startup
     _last_cleanup = datetime.utcnow()
     cleanup_old_results()
+    requeue_stale_jobs()
 
-    while not _shutdown:
+    idle_streak = 0
+    while not _shutdown_evt.is_set():
         try:
-            jobs = pick_pending_jobs(limit=MAX_JOBS_PER_CYCLE if MAX_JOBS_PER_CYCLE > 0 else None)
-            if jobs:
-                for job in jobs:
-                    if _shutdown:
-                        break
-                    process_job(job)
+            # every job it claims is written (or requeued) before the purge/cleanup passes below
+            ran = run_jobs(limit=MAX_JOBS_PER_CYCLE if MAX_JOBS_PER_CYCLE > 0 else None)
+            idle_streak = 0 if ran else idle_streak + 1
 
             # NEW: run purge pass every cycle (POLL_SECONDS defaults to 60)
             purge_deleted_results()
 
+            # log out IMAP sessions nobody has reused within IMAP_IDLE_TTL
+            scraper.pool.close_idle()
+
             # Daily cleanup (already in your code)
             now = datetime.utcnow()
             if (now - _last_cleanup).total_seconds() >= 86400:
                 cleanup_old_results()
                 _last_cleanup = now
 
-            time.sleep(POLL_SECONDS)
+            wait_for_work(poll_delay(idle_streak))
 
         except SQLAlchemyError as db_err:
             print(f"[DB ERROR] {db_err}")
-            time.sleep(POLL_SECONDS)
+            wait_for_work(POLL_SECONDS)
         except Exception as e:
             print(f"[ERROR] {type(e).__name__}: {e}")
-            time.sleep(POLL_SECONDS)
+            wait_for_work(POLL_SECONDS)
 
+    scraper.pool.close_all()
+    close_db()
     print("[SYS] MailScraper service stopped.")
 
 
@@ -2,10 +2,11 @@
 from __future__ import annotations
 
 import re
+from dataclasses import dataclass
+from functools import lru_cache
 from typing import List, Optional, Tuple, Iterable
 from email.utils import parseaddr
 
-import html2text
 from bs4 import BeautifulSoup
 import tldextract  # pip install tldextract
 
@@ -31,73 +32,236 @@ TRACKING_HINTS = (
 
 CURRENCY_HINTS = ("rs.", "rs", "₹", "$", "usd", "inr", "eur")
 
+# lines dropped outright while cleaning the body text
+_DROP_LINE_WORDS = UNSUB_WORDS + COPYRIGHT_WORDS
 
-class ImprovedSignatureExtractor:
-    def __init__(self):
-        self.job_titles = [
-            "CEO","CTO","CFO","COO","CMO","CIO","CDO","Manager","Director","Engineer",
-            "Developer","Analyst","Designer","Lead","Head","Specialist","Officer",
-            "President","Vice President","VP","Partner","Consultant","Architect",
-            "Coordinator","Administrator","Executive","Founder","Co-Founder","Owner",
-            "Principal","Associate","Assistant","Supervisor","Team Lead","Product Manager",
-            "Project Manager","Sales Manager","Marketing Manager","Senior","Junior","Staff"
-        ]
-        self.email_pattern  = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        self.phone_pattern  = r'(?:\+?\d{1,3}[\s.-]?)?\(?\d{2,4}\)?[\s.-]?\d{3,4}[\s.-]?\d{3,4}(?:\s*(?:ext|x|extension)\s*\d{1,5})?'
-        self.website_pattern= r'(?:https?://)?(?:www\.)?[a-zA-Z0-9][-a-zA-Z0-9]*\.[a-zA-Z]{2,}(?:/[^\s]*)?'
-
-        self.metadata_patterns = [
-            r'^From:\s*.+$', r'^Sent:\s*.+$', r'^To:\s*.+$', r'^Subject:\s*.+$',
-            r'^Date:\s*.+$', r'^Cc:\s*.+$', r'^Bcc:\s*.+$',
-            r'^\*\*From:\*\*.+$', r'^\*\*Sent:\*\*.+$', r'^\*\*To:\*\*.+$', r'^\*\*Subject:\*\*.+$',
-        ]
-        self.signature_separators = [
-            r'^[\s_*=-]{2,}$', r'^--\s*$', r'^Thanks?[,!]?\s*$', r'^Best[,!]?\s*$',
-            r'^Regards?[,!]?\s*$', r'^Sincerely[,!]?\s*$', r'^Cheers?[,!]?\s*$',
-            r'^Warm regards?[,!]?\s*$', r'^Kind regards?[,!]?\s*$', r'^Best regards?[,!]?\s*$',
-        ]
+_BLOCKED_EMAIL_HOSTS = ("example.com", "test.com", "localhost")
+
+# line guards for the company-name scans
+_GREETING_WORDS = ("dear", "hello", "hi,", "regards", "thanks")
+_NOT_A_BRAND_WORDS = ("dear", "thanks", "regards", "hello", "team", "support")
+_ROLE_LINE_WORDS = ("team", "support", "helpdesk", "noreply", "no-reply")
+_COPYRIGHT_LINE_WORDS = ("copyright", "©", "all rights reserved")
+
+# punctuation trimmed off tokens before domain checks
+_STRIP_CHARS = ".,;·*()[]{}<>|\"'"
+
+# Patterns are compiled once at import; the per-line loops below run them
+# thousands of times per mailbox scan.
+_EMAIL_RE = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+_PHONE_RE = re.compile(r'(?:\+?\d{1,3}[\s.-]?)?\(?\d{2,4}\)?[\s.-]?\d{3,4}[\s.-]?\d{3,4}(?:\s*(?:ext|x|extension)\s*\d{1,5})?')
+_WEBSITE_RE = re.compile(r'(?:https?://)?(?:www\.)?[a-zA-Z0-9][-a-zA-Z0-9]*\.[a-zA-Z]{2,}(?:/[^\s]*)?')
+# any of the three above: lines carrying contact details are never a title/address
+_CONTACT_RE = re.compile(rf'(?:{_EMAIL_RE.pattern})|(?:{_PHONE_RE.pattern})|(?:{_WEBSITE_RE.pattern})')
+
+_METADATA_PATTERNS = (
+    r'^From:\s*.+$', r'^Sent:\s*.+$', r'^To:\s*.+$', r'^Subject:\s*.+$',
+    r'^Date:\s*.+$', r'^Cc:\s*.+$', r'^Bcc:\s*.+$',
+    r'^\*\*From:\*\*.+$', r'^\*\*Sent:\*\*.+$', r'^\*\*To:\*\*.+$', r'^\*\*Subject:\*\*.+$',
+)
+_SEPARATOR_PATTERNS = (
+    r'^[\s_*=-]{2,}$', r'^--\s*$', r'^Thanks?[,!]?\s*$', r'^Best[,!]?\s*$',
+    r'^Regards?[,!]?\s*$', r'^Sincerely[,!]?\s*$', r'^Cheers?[,!]?\s*$',
+    r'^Warm regards?[,!]?\s*$', r'^Kind regards?[,!]?\s*$', r'^Best regards?[,!]?\s*$',
+)
+
+
+def _union(patterns: Iterable[str], flags: int = re.IGNORECASE) -> re.Pattern:
+    """OR-join patterns into one regex so each line is matched in a single call."""
+    return re.compile("|".join(f"(?:{p})" for p in patterns), flags)
 
-        # generic tokens we strip from domain-derived brand names
-        self._generic_brand_tokens = {
-            "mail","email","mailer","mx","smtp","noreply","no-reply","notify","notification",
-            "newsletter","news","updates","support","help","helpdesk","service","services",
-            "account","accounts","communication","gateway","secure","auth","login","signin",
-            "web","app","apps","cloud","online","corp","company"
-        }
 
-    _MINI_ROLE_WORDS = {
+_METADATA_RE = _union(_METADATA_PATTERNS)
+_SEPARATOR_RE = _union(_SEPARATOR_PATTERNS)
+_CLOSING_RE = re.compile(
+    r'\b(Best|Regards|Sincerely|Thank you|Thanks|Cheers|Warm regards|Kind regards|Best regards)\b',
+    re.IGNORECASE,
+)
+
+_DIGIT_RE = re.compile(r'\d')
+_DIGITS_RE = re.compile(r'\d+')
+_NON_DIGIT_RE = re.compile(r'[^\d]')
+_BRAND_SPLIT_RE = re.compile(r'[-_]')
+_LOCAL_SPLIT_RE = re.compile(r'[._\-]+')
+_CAMEL_RE = re.compile(r'([a-z])([A-Z])')
+_EDGE_DIGITS_RE = re.compile(r'^\d+|\d+$')
+_ALPHA_RE = re.compile(r'[A-Za-z]')
+
+_PHONE_EXT_RE = re.compile(r'(?:ext|x|extension)\s*(\d{1,5})\b', re.IGNORECASE)
+_PHONE_SEP_RE = re.compile(r'[()\s.\-]')
+_PHONE_CONTEXT_WORDS = r'(?:phone|mobile|cell|tel|telephone|call|contact|office|work|fax)'
+# a number-like chunk with separators; at least 7 digits overall
+_PHONE_CHUNK = r'\+?\d[\d\s().-]{5,24}\d'
+_PHONE_CONTEXT_RE = re.compile(
+    rf'(?:{_PHONE_CONTEXT_WORDS}\s*[:\-]?\s*(?P<after>{_PHONE_CHUNK}))'
+    rf'|(?:(?P<before>{_PHONE_CHUNK})\s*(?:{_PHONE_CONTEXT_WORDS}))',
+    re.IGNORECASE
+)
+_PHONE_LOOSE_RE = re.compile(rf'(?P<loose>{_PHONE_CHUNK})')
+_E164_RE = re.compile(r'\+[1-9]\d{6,14}')
+_LOCAL_PHONE_RE = re.compile(r'\d{7,12}')
+
+# Core "head" nouns for titles (we'll allow 0–3 capitalized words before these)
+_TITLE_HEAD_NOUNS = (
+    "Manager|Director|Engineer|Coordinator|Architect|Analyst|Designer|Officer|"
+    "Executive|Developer|Consultant|Specialist|Administrator|Supervisor|Owner|"
+    "Founder|President"
+)
+# Seniority / modifiers we may see before the phrase
+_TITLE_SENIORITY = r"(?:Senior|Sr\.|Junior|Jr\.|Lead|Principal|Head|Chief|Assistant|Associate)"
+# Up to 3 capitalized tokens before the head noun (e.g., "IT", "Account", "Service Ops")
+_TITLE_PRE_MODS = r"(?:(?:[A-Z][A-Za-z/&+.-]{1,20}|[A-Z]{2,6})\s+){0,3}"
+
+# Pattern 1: generic titles like "Service Ops Director", "Account Manager", "Senior Product Manager"
+_GENERIC_TITLE_PAT = re.compile(
+    rf"\b(?:{_TITLE_SENIORITY}\s+)?{_TITLE_PRE_MODS}(?:{_TITLE_HEAD_NOUNS})\b",
+    re.IGNORECASE,
+)
+# Pattern 2: C-suite & short forms that stand on their own
+_CSUITE_PAT = re.compile(
+    r"\b(?:CEO|CTO|CFO|COO|CMO|CIO|CDO|CPO|CSO|CHRO|CISO|CRO|VP|Vice President)\b",
+    re.IGNORECASE,
+)
+_TITLE_PUNCT_RE = re.compile(r"[,.;:|–—\-]")
+_URL_HINT_RE = re.compile(r"https?://|\bwww\.", re.IGNORECASE)
+# cheap gate before tldextract: the host part (up to / ? #) must have a dot followed
+# by a letter, since every public-suffix label starts with one
+_HOST_HAS_TLD_RE = re.compile(r"(?:https?://)?[^/?#]*?[.\u3002\uff0e\uff61][^\W\d_]")
+_BARE_DOMAIN_RE = re.compile(r"[A-Za-z0-9.-]+\.[A-Za-z]{2,}")
+
+# a company phrase ending in a legal suffix ("Samsung Electronics Co. Ltd.")
+_LEGAL_SUFFIX_ALT = "|".join(re.escape(s) for s in LEGAL_SUFFIXES)
+_LEGAL_COMPANY_RE = re.compile(rf'([A-Z][\w&.,\- ]{{1,100}}?\b(?:{_LEGAL_SUFFIX_ALT})\.?)\b')
+
+_ADDRESS_RES = tuple(re.compile(p, re.IGNORECASE) for p in (
+    r'\b(Street|St|Road|Rd|Avenue|Ave|Boulevard|Blvd|Lane|Ln|Drive|Dr)\b',
+    r'\b(Suite|Ste|Floor|Fl|Room|Unit|Building|Tower|Center|Centre)\b',
+    r'\b(City|State|Province|Country|Zip|Postal|Code)\b',
+    r'\d{3,6}',
+))
+_ADDRESS_JUNK_RE = re.compile(r'[|\[\]{}]')
+
+
+@lru_cache(maxsize=4096)
+def _tld_parts(url_or_host: str) -> Tuple[str, str]:
+    """
+    (registered_domain, full_host) for a lowercased URL or host, or ("", "") when it
+    has no public suffix. Cached: the same few domains repeat across links, footers
+    and sender headers, and every lookup walks tldextract's suffix trie.
+    """
+    ext = tldextract.extract(url_or_host)
+    if not ext.suffix:  # no TLD
+        return "", ""
+    registered = ".".join(part for part in [ext.domain, ext.suffix] if part)
+    full_host = ".".join(part for part in [ext.subdomain, ext.domain, ext.suffix] if part)
+    return registered, full_host
+
+
+_SIMPLE_ADDR = r'[^\s<>@,;:"()\\\[\]]+@[^\s<>@,;:"()\\\[\]]+'
+# 'Jane Doe <jane@acme.com>' / '"Doe Jane" <jane@acme.com>' / 'jane@acme.com'
+_NAME_ADDR_RE = re.compile(rf'\s*(?:"([^"\\]*)"|([^"<>,;:@()\\\[\]]*?))\s*<({_SIMPLE_ADDR})>\s*')
+_BARE_ADDR_RE = re.compile(rf'\s*({_SIMPLE_ADDR})\s*')
+
+
+def _parse_sender(header: str) -> Tuple[str, str]:
+    """
+    parseaddr() with a fast path for the plain 'Name <addr>' and bare 'addr' shapes
+    most From headers take; anything with comments, escapes, commas or groups still
+    goes through the full RFC 2822 parser.
+    """
+    m = _NAME_ADDR_RE.fullmatch(header)
+    if m:
+        quoted, plain, addr = m.groups()
+        return (quoted if quoted is not None else " ".join(plain.split())), addr
+    m = _BARE_ADDR_RE.fullmatch(header)
+    if m:
+        return "", m.group(1)
+    return parseaddr(header)
+
+
+@lru_cache(maxsize=256)
+def _local_bits(local: str) -> Tuple[str, ...]:
+    """Email local-part without its +tag, split on . _ -; shared by the role and name checks."""
+    return tuple(_LOCAL_SPLIT_RE.split(local.split('+', 1)[0]))
+
+
+def _contains_any(lowered: str, words: Iterable[str]) -> bool:
+    return any(w in lowered for w in words)
+
+
+@dataclass(slots=True)
+class _LineInfo:
+    """One signature line, classified once and shared by the company/title/address scans."""
+    text: str
+    lower: str
+    has_contact: bool   # email, phone number or URL
+    email_or_url: bool  # looser '@' / URL / bare-domain test used for company names
+
+
+def _clean_phrase(s: str) -> str:
+    """Trim punctuation/extra spaces around a title phrase."""
+    return " ".join(s.split()).strip(",.;:—- ")
+
+
+class ImprovedSignatureExtractor:
+    # Stateless: everything below is shared by all instances (and threads), so
+    # building an extractor per message costs nothing.
+    __slots__ = ()
+
+    job_titles = (
+        "CEO","CTO","CFO","COO","CMO","CIO","CDO","Manager","Director","Engineer",
+        "Developer","Analyst","Designer","Lead","Head","Specialist","Officer",
+        "President","Vice President","VP","Partner","Consultant","Architect",
+        "Coordinator","Administrator","Executive","Founder","Co-Founder","Owner",
+        "Principal","Associate","Assistant","Supervisor","Team Lead","Product Manager",
+        "Project Manager","Sales Manager","Marketing Manager","Senior","Junior","Staff"
+    )
+    email_pattern  = _EMAIL_RE.pattern
+    phone_pattern  = _PHONE_RE.pattern
+    website_pattern= _WEBSITE_RE.pattern
+
+    metadata_patterns = _METADATA_PATTERNS
+    signature_separators = _SEPARATOR_PATTERNS
+
+    # generic tokens we strip from domain-derived brand names
+    _generic_brand_tokens = frozenset({
+        "mail","email","mailer","mx","smtp","noreply","no-reply","notify","notification",
+        "newsletter","news","updates","support","help","helpdesk","service","services",
+        "account","accounts","communication","gateway","secure","auth","login","signin",
+        "web","app","apps","cloud","online","corp","company"
+    })
+
+    _MINI_ROLE_WORDS = frozenset({
         "support","help","hello","contact","team","sales","marketing","info",
         "noreply","no-reply","donotreply","newsletter","alerts","updates",
         "admin","hr","jobs","career","careers","billing","accounts"
-    }
+    })
 
     def _cap(self, s: str) -> str:
         s = s.strip()
-        return s if not s else s[0].upper() + s[1:].lower()
+        if not s or (s[0].isupper() and s[1:].islower()):
+            return s  # already capitalized
+        return s[0].upper() + s[1:].lower()
 
     def _looks_like_person(self, disp: str) -> bool:
         # two tokens, mostly letters, no obvious role words
         toks = [t for t in disp.strip().split() if any(c.isalpha() for c in t)]
         if len(toks) < 2: 
             return False
-        low = disp.lower()
-        if any(w in low for w in self._MINI_ROLE_WORDS):
+        if _contains_any(disp.lower(), self._MINI_ROLE_WORDS):
             return False
         return True
 
     def _split_local_simple(self, local: str) -> list[str]:
-        base = local.split('+', 1)[0]
-        parts = re.split(r'[._\-]+', base)
-        if len(parts) == 1 and re.search(r'[a-z][A-Z]', parts[0]):  # camelCase → "John Doe"
-            parts = re.sub(r'([a-z])([A-Z])', r'\1 \2', parts[0]).split()
-        parts = [re.sub(r'^\d+|\d+$', '', p) for p in parts]        # trim edge digits
-        parts = [p for p in parts if re.search(r'[A-Za-z]', p)]     # keep alphabetic-ish
+        parts = list(_local_bits(local))
+        if len(parts) == 1 and _CAMEL_RE.search(parts[0]):  # camelCase → "John Doe"
+            parts = _CAMEL_RE.sub(r'\1 \2', parts[0]).split()
+        parts = [_EDGE_DIGITS_RE.sub('', p) for p in parts]  # trim edge digits
+        parts = [p for p in parts if _ALPHA_RE.search(p)]     # keep alphabetic-ish
         return parts
 
     def _is_role_local(self, local: str) -> bool:
-        base = local.split('+', 1)[0].lower()
-        bits = re.split(r'[._\-]+', base)
-        return any(b in self._MINI_ROLE_WORDS for b in bits)
+        return any(b.lower() in self._MINI_ROLE_WORDS for b in _local_bits(local))
 
     def _name_from_email_simple(self, email_addr: str) -> tuple[Optional[str], Optional[str], Optional[str]]:
         if not email_addr or '@' not in email_addr:
@@ -125,7 +289,7 @@ class ImprovedSignatureExtractor:
     def _simple_name_from_header_or_email(self, sender_header: Optional[str], fallback_email: Optional[str]):
         # 1) Try display name
         if sender_header:
-            disp, addr = parseaddr(sender_header)
+            disp, addr = _parse_sender(sender_header)
             disp = disp.strip(' "\'|,;()[]')
             if self._looks_like_person(disp):
                 toks = [t for t in disp.split() if any(c.isalpha() for c in t)]
@@ -144,11 +308,10 @@ class ImprovedSignatureExtractor:
 
     # ---------- helpers ----------
     def _text_has(self, s: str, words: Iterable[str]) -> bool:
-        sl = s.lower()
-        return any(w in sl for w in words)
+        return _contains_any(s.lower(), words)
 
     def _clean_token(self, w: str) -> str:
-        return w.strip(".,;·*()[]{}<>|\"'")
+        return w.strip(_STRIP_CHARS)
 
     def _valid_domain(self, token: str) -> Optional[str]:
         """
@@ -169,19 +332,14 @@ class ImprovedSignatureExtractor:
         else:
             candidate = token
 
-        ext = tldextract.extract(candidate)
-        if not ext.suffix:  # no TLD
-            return None
-
-        registered = ".".join(part for part in [ext.domain, ext.suffix] if part)
+        registered, full_host = _tld_parts(candidate.lower())
         if not registered:
             return None
 
-        full_host = ".".join(part for part in [ext.subdomain, ext.domain, ext.suffix] if part)
         if self._text_has(full_host, TRACKING_HINTS):
             return None
 
-        return registered.lower()
+        return registered
 
     def _brand_from_registered_domain(self, registered_domain: Optional[str]) -> Optional[str]:
         """
@@ -195,10 +353,10 @@ class ImprovedSignatureExtractor:
         # Take the registrable label (leftmost part before the first dot)
         label = rd.split(".", 1)[0]  # 'microsoft' in microsoft.com
         # strip digits and generic noise from label edges
-        label = re.sub(r'\d+', '', label)
+        label = _DIGITS_RE.sub('', label)
 
         # split on hyphen/underscore; drop generic tokens if multiple parts
-        parts = [p for p in re.split(r"[-_]", label) if p]
+        parts = [p for p in _BRAND_SPLIT_RE.split(label) if p]
         if len(parts) > 1:
             parts = [p for p in parts if p not in self._generic_brand_tokens]
 
@@ -225,60 +383,62 @@ class ImprovedSignatureExtractor:
         return norm[0] if norm else None
 
     # ---------- HTML + text cleaning ----------
-    def _extract_links_and_text(self, raw_html_or_text: str) -> Tuple[List[str], List[str]]:
+    def _extract_links_and_text(self, raw_html_or_text: str, is_html: Optional[bool] = None) -> Tuple[List[str], List[str]]:
         """
         Returns (valid_domains_from_links, cleaned_text_lines).
         Parses links BEFORE converting to text so we don't lose anchor hrefs.
+        is_html=False (a text/plain body) skips HTML parsing altogether, as does an
+        unlabelled body with no '<' or '&' in it, since the parser could not change it.
         """
         links_domains: List[str] = []
 
-        soup = BeautifulSoup(raw_html_or_text, 'html.parser')
-
-        # collect hrefs
-        for a in soup.find_all("a", href=True):
-            href = a["href"].split("?")[0]
-            dom = self._valid_domain(href)
-            if dom:
-                links_domains.append(dom)
-
-        # remove noisy tags for text
-        for tag in soup(["script", "style", "meta", "link", "head"]):
-            tag.decompose()
-
-        text = soup.get_text(separator="\n")
-        if not text.strip():
-            # fallback to html2text only if soup yielded nothing
-            h = html2text.HTML2Text()
-            h.ignore_links = True
-            h.ignore_images = True
-            h.ignore_emphasis = False
-            text = h.handle(raw_html_or_text)
-
-        # remove unsubscribe/copyright/price lines early + very long boilerplate
-        lines = []
-        for line in (ln.strip() for ln in text.splitlines()):
-            if not line:
-                continue
-            if len(line) > 200:
+        if is_html is False or (
+            is_html is None and "<" not in raw_html_or_text and "&" not in raw_html_or_text
+        ):
+            # plain text has no anchors and nothing to strip
+            text = raw_html_or_text
+        else:
+            soup = BeautifulSoup(raw_html_or_text, 'lxml')
+
+            # one tree walk: collect hrefs and remove noisy tags for text
+            for tag in soup.find_all(["a", "script", "style", "meta", "link", "head"]):
+                if tag.name != "a":
+                    tag.decompose()
+                    continue
+                href = tag.get("href")
+                if href is None:
+                    continue
+                dom = self._valid_domain(href.split("?")[0])
+                if dom:
+                    links_domains.append(dom)
+
+            text = soup.get_text(separator="\n")
+            if not text.strip():
+                # fallback to html2text only if soup yielded nothing; imported here so
+                # the common path never pays for loading it
+                import html2text
+
+                h = html2text.HTML2Text()
+                h.ignore_links = True
+                h.ignore_images = True
+                h.ignore_emphasis = False
+                text = h.handle(raw_html_or_text)
+
+        # one pass: drop blank/very long boilerplate, unsubscribe/copyright/price
+        # and metadata lines, and collapse consecutive duplicates
+        dedup, prev = [], None
+        for raw in text.splitlines():
+            line = raw.strip()
+            if not line or len(line) > 200:
                 continue
             lcl = line.lower()
-            if any(x in lcl for x in UNSUB_WORDS) or any(cw in lcl for cw in COPYRIGHT_WORDS):
+            if _contains_any(lcl, _DROP_LINE_WORDS):
                 continue
             # drop obvious price-like lines ("Rs.62999*", "$15000", etc.)
-            if self._text_has(lcl, CURRENCY_HINTS) and re.search(r'\d', lcl):
+            if self._text_has(lcl, CURRENCY_HINTS) and _DIGIT_RE.search(lcl):
                 continue
-            lines.append(line)
-
-        # drop metadata
-        cleaned = []
-        for line in lines:
-            if any(re.match(p, line, re.IGNORECASE) for p in self.metadata_patterns):
+            if _METADATA_RE.match(line):
                 continue
-            cleaned.append(line)
-
-        # dedup consecutive
-        dedup, prev = [], None
-        for line in cleaned:
             if line != prev:
                 dedup.append(line)
                 prev = line
@@ -287,22 +447,33 @@ class ImprovedSignatureExtractor:
 
     # ---------- detection ----------
     def find_signature_start(self, lines: List[str]) -> int:
-        for i in range(len(lines) - 1, max(0, len(lines) - 30), -1):
-            line = lines[i].strip()
-            if any(re.match(p, line, re.IGNORECASE) for p in self.signature_separators):
-                return i
-        for i in range(len(lines) - 1, max(0, len(lines) - 25), -1):
-            if re.search(r'\b(Best|Regards|Sincerely|Thank you|Thanks|Cheers|Warm regards|Kind regards|Best regards)\b', lines[i], re.IGNORECASE):
+        """
+        Walk the tail once, bottom-up. A separator within the last 29 lines wins
+        outright; otherwise the lowest closing word within 24 lines, then the
+        lowest contact line within 19 lines (minus 5 to catch the name above it).
+        """
+        n = len(lines)
+        closing_at = contact_at = None
+        for i in range(n - 1, max(0, n - 30), -1):
+            line = lines[i]
+            if _SEPARATOR_RE.match(line.strip()):
                 return i
-        for i in range(len(lines) - 1, max(0, len(lines) - 20), -1):
-            if re.search(self.email_pattern, lines[i]) or re.search(self.phone_pattern, lines[i]):
-                return max(0, i - 5)
-        return max(0, len(lines) - 15)
+            if closing_at is None and i > n - 25 and _CLOSING_RE.search(line):
+                closing_at = i
+            if closing_at is None and contact_at is None and i > n - 20 and (
+                _EMAIL_RE.search(line) or _PHONE_RE.search(line)
+            ):
+                contact_at = i
+        if closing_at is not None:
+            return closing_at
+        if contact_at is not None:
+            return max(0, contact_at - 5)
+        return max(0, n - 15)
 
     # ---------- components ----------
     def extract_emails(self, text: str) -> list[str]:
-        emails = re.findall(self.email_pattern, text, re.IGNORECASE)
-        return list(dict.fromkeys([e for e in emails if not re.search(r'(example\.com|test\.com|localhost)', e, re.IGNORECASE)]))
+        emails = _EMAIL_RE.findall(text)
+        return list(dict.fromkeys(e for e in emails if not self._text_has(e, _BLOCKED_EMAIL_HOSTS)))
 
     # add these helpers anywhere inside the class
     def _normalize_phone(self, s: str) -> tuple[str, str | None]:
@@ -311,13 +482,13 @@ class ImprovedSignatureExtractor:
         Returns (main_number, ext) where ext may be None.
         """
         # extract extension
-        ext_match = re.search(r'(?:ext|x|extension)\s*(\d{1,5})\b', s, re.IGNORECASE)
+        ext_match = _PHONE_EXT_RE.search(s)
         ext = ext_match.group(1) if ext_match else None
 
         # strip everything except digits and leading +
         s = s.strip()
         has_plus = s.strip().startswith('+')
-        digits = re.sub(r'[^\d]', '', s)
+        digits = _NON_DIGIT_RE.sub('', s)
         if has_plus:
             norm = f'+{digits}'
         else:
@@ -331,7 +502,7 @@ class ImprovedSignatureExtractor:
         - or > 12 digits without plus (too long for many local formats)
         """
         # no separators in original?
-        sep_in_original = bool(re.search(r'[()\s.\-]', original))
+        sep_in_original = bool(_PHONE_SEP_RE.search(original))
         # long uninterrupted digits without plus?
         if not original.strip().startswith('+') and not sep_in_original and len(normalized) >= 12:
             return True
@@ -347,36 +518,19 @@ class ImprovedSignatureExtractor:
         - Handles extensions (ext/x/extension 123)
         """
 
-        # 1) find candidates with context (preferred)
-        context_words = r'(?:phone|mobile|cell|tel|telephone|call|contact|office|work|fax)'
-        # capture a number-like chunk with separators; require at least 7 digits overall
-        number_chunk = r'(\+?\d[\d\s().-]{5,24}\d)'
-        context_pattern = re.compile(
-            rf'(?:{context_words}\s*[:\-]?\s*{number_chunk})|(?:{number_chunk}\s*(?:{context_words}))',
-            re.IGNORECASE
-        )
-
-        # 2) fallback: standalone number-like chunks with separators or leading +
-        loose_pattern = re.compile(r'(\+?\d[\d\s().-]{5,24}\d)')
-
-        candidates: list[tuple[str, str]] = []  # (original_chunk, source) source = 'context' | 'loose'
-
-        for m in context_pattern.finditer(text):
-            # the regex has two capture groups; pick the one that matched
-            chunk = m.group(1) or m.group(2)
-            if chunk:
-                candidates.append((chunk, 'context'))
-
+        # (original_chunk, offset in text); the offset comes straight from the
+        # match so the price check below needs no text.find per candidate
+        candidates: list[tuple[str, int]] = [
+            (m.group(m.lastgroup), m.start(m.lastgroup)) for m in _PHONE_CONTEXT_RE.finditer(text)
+        ]
+        # fallback: standalone number-like chunks with separators or leading +
         if not candidates:
-            for m in loose_pattern.finditer(text):
-                chunk = m.group(1)
-                if chunk:
-                    candidates.append((chunk, 'loose'))
+            candidates = [(m.group('loose'), m.start('loose')) for m in _PHONE_LOOSE_RE.finditer(text)]
 
         results: list[str] = []
         seen: set[str] = set()
 
-        for original, source in candidates:
+        for original, pos in candidates:
             norm, ext = self._normalize_phone(original)
 
             # basic sanity
@@ -390,17 +544,17 @@ class ImprovedSignatureExtractor:
             # E.164 strict if has '+'
             if norm.startswith('+'):
                 # must be + followed by 7–15 digits total
-                if not re.fullmatch(r'\+[1-9]\d{6,14}', norm):
+                if not _E164_RE.fullmatch(norm):
                     continue
             else:
                 # no plus: keep only 7–12 digits (avoid very long IDs)
-                if not re.fullmatch(r'\d{7,12}', norm):
+                if not _LOCAL_PHONE_RE.fullmatch(norm):
                     continue
 
             # avoid price-like fragments (₹/$ with digits nearby already filtered upstream,
             # but double-check around the original chunk)
             window = 6
-            start = max(0, text.find(original) - window)
+            start = max(0, pos - window)
             end = min(len(text), start + len(original) + 2 * window)
             around = text[start:end].lower()
             if self._text_has(around, CURRENCY_HINTS):
@@ -416,20 +570,24 @@ class ImprovedSignatureExtractor:
 
         return results
 
-    def extract_websites(self, raw_html_or_text: str, lines: List[str], sender_domain: Optional[str]) -> Optional[str]:
+    def extract_websites(
+        self, raw_html_or_text: str, lines: List[str], sender_domain: Optional[str], is_html: Optional[bool] = None,
+        links_domains: Optional[List[str]] = None,
+    ) -> Optional[str]:
         """
         Extract a reliable website:
-        - Parse <a href> links, validate domains
+        - Parse <a href> links, validate domains (pass links_domains if the body was already parsed)
         - Scan text tokens for domains and validate
         - Prefer sender_domain; otherwise pick a clean, short registered domain
         """
-        links_domains, _ = self._extract_links_and_text(raw_html_or_text)
+        if links_domains is None:
+            links_domains, _ = self._extract_links_and_text(raw_html_or_text, is_html)
         text_domains: List[str] = []
 
         for line in lines:
             for word in line.split():
-                token = self._clean_token(word)
-                if "." not in token or "@" in token:
+                token = word.strip(_STRIP_CHARS)
+                if "." not in token or "@" in token or not _HOST_HAS_TLD_RE.match(token):
                     continue
                 dom = self._valid_domain(token)
                 if dom:
@@ -438,7 +596,13 @@ class ImprovedSignatureExtractor:
         candidates = list(dict.fromkeys(links_domains + text_domains))
         return self._prefer_website(candidates, sender_domain)
 
-    def extract_job_title(self, lines: List[str]) -> Optional[str]:
+    def _line_infos(self, lines: List[str]) -> List[_LineInfo]:
+        return [
+            _LineInfo(line, line.lower(), bool(_CONTACT_RE.search(line)), self._looks_like_email_or_url(line))
+            for line in lines
+        ]
+
+    def extract_job_title(self, lines: List[str], infos: Optional[List[_LineInfo]] = None) -> Optional[str]:
         """
         Extracts just the job-title phrase from signature lines.
         Examples it captures:
@@ -451,55 +615,21 @@ class ImprovedSignatureExtractor:
         - "CEO", "CTO", ...
         It avoids returning the rest of the sentence around the title.
         """
-        # Core "head" nouns for titles (we'll allow 0–3 capitalized words before these)
-        head_nouns = (
-            "Manager|Director|Engineer|Coordinator|Architect|Analyst|Designer|Officer|"
-            "Executive|Developer|Consultant|Specialist|Administrator|Supervisor|Owner|"
-            "Founder|President"
-        )
-
-        # Seniority / modifiers we may see before the phrase
-        seniority = r"(?:Senior|Sr\.|Junior|Jr\.|Lead|Principal|Head|Chief|Assistant|Associate)"
-
-        # Up to 3 capitalized tokens before the head noun (e.g., "IT", "Account", "Service Ops")
-        pre_modifiers = r"(?:(?:[A-Z][A-Za-z/&+.-]{1,20}|[A-Z]{2,6})\s+){0,3}"
-
-        # Pattern 1: generic titles like "Service Ops Director", "Account Manager", "Senior Product Manager"
-        generic_title_pat = re.compile(
-            rf"\b(?:{seniority}\s+)?{pre_modifiers}(?:{head_nouns})\b",
-            re.IGNORECASE,
-        )
-
-        # Pattern 2: C-suite & short forms that stand on their own
-        csuite_pat = re.compile(
-            r"\b(?:CEO|CTO|CFO|COO|CMO|CIO|CDO|CPO|CSO|CHRO|CISO|CRO|VP|Vice President)\b",
-            re.IGNORECASE,
-        )
-
-        # Helper to trim punctuation/extra spaces
-        def _clean_phrase(s: str) -> str:
-            s = re.sub(r"\s{2,}", " ", s).strip()
-            return s.strip(",.;:—- ")
-
         # Scan a few likely signature lines
-        for line in lines[:12]:
+        for info in (infos or self._line_infos(lines))[:12]:
+            line = info.text
             # Skip obvious non-title lines
-            if (
-                re.search(self.email_pattern, line, re.IGNORECASE)
-                or re.search(self.phone_pattern, line)
-                or re.search(self.website_pattern, line, re.IGNORECASE)
-                or len(line) < 2
-            ):
+            if info.has_contact or len(line) < 2:
                 continue
 
             # Try C-suite first (simple, precise)
-            m2 = csuite_pat.search(line)
+            m2 = _CSUITE_PAT.search(line)
             if m2:
                 return _clean_phrase(m2.group(0).title() if m2.group(0).isupper() else m2.group(0))
 
             # Then generic titles with optional modifiers
             # Find the *shortest* reasonable match in case multiple exist on a long line
-            matches = list(generic_title_pat.finditer(line))
+            matches = list(_GENERIC_TITLE_PAT.finditer(line))
             if matches:
                 # Prefer the match that ends closest to punctuation/comma (often the “title” chunk)
                 # then fallback to the shortest span.
@@ -508,7 +638,7 @@ class ImprovedSignatureExtractor:
                 for m in matches:
                     span = m.span()
                     after = line[span[1]:]
-                    punct_pos = re.search(r"[,.;:|–—\-]", after)
+                    punct_pos = _TITLE_PUNCT_RE.search(after)
                     dist = punct_pos.start() if punct_pos else len(after)
                     span_len = span[1] - span[0]
                     score = (dist, span_len)
@@ -532,33 +662,36 @@ class ImprovedSignatureExtractor:
         return None
 
 
-    def _extract_company_from_line(self, line: str) -> Optional[str]:
+    def _extract_company_from_line(self, line: str, lower: Optional[str] = None) -> Optional[str]:
         """
         Capture a company phrase ending with a legal suffix, while trimming trailing boilerplate.
         Example: "Samsung Electronics Co. Ltd. All rights reserved" -> "Samsung Electronics Co. Ltd."
         """
-        if self._text_has(line, COPYRIGHT_WORDS) or self._text_has(line, CURRENCY_HINTS):
+        if lower is None:
+            lower = line.lower()
+        if _contains_any(lower, COPYRIGHT_WORDS) or _contains_any(lower, CURRENCY_HINTS):
             return None
         if len(line) > 120 or len(line) < 3:
             return None
 
         # Legal-suffix anchored phrase
-        pattern = r'([A-Z][\w&.,\- ]{1,100}?\b(?:' + "|".join(re.escape(s) for s in LEGAL_SUFFIXES) + r')\.?)\b'
-        m = re.search(pattern, line)
+        m = _LEGAL_COMPANY_RE.search(line)
         if m:
             company = m.group(1)
-            company = re.sub(r'\s{2,}', ' ', company).strip(" ,.-")
+            company = " ".join(company.split()).strip(" ,.-")
             return company
 
         # Fallback: short capitalized phrase that looks like a brand
-        words = [w for w in re.split(r'\s+', line.strip()) if w]
+        words = line.split()
         if 1 <= len(words) <= 6 and all(any(ch.isalpha() for ch in w) for w in words):
-            if not self._text_has(line, ("dear", "thanks", "regards", "hello", "team", "support")):
+            if not _contains_any(lower, _NOT_A_BRAND_WORDS):
                 return line.strip(" .,|-")
 
         return None
 
-    def extract_company_name(self, lines: List[str], sender_domain: Optional[str]) -> Optional[str]:
+    def extract_company_name(
+        self, lines: List[str], sender_domain: Optional[str], infos: Optional[List[_LineInfo]] = None
+    ) -> Optional[str]:
         """
         Strategy:
         1) If we have a sender registered domain -> derive brand dynamically (no hard-coded map).
@@ -571,29 +704,29 @@ class ImprovedSignatureExtractor:
         if brand:
             return brand
 
+        infos = (infos or self._line_infos(lines[:12]))[:12]
+
         # 2) Scan lines for a legal-suffix company phrase
-        for line in lines[:12]:
-            if self._text_has(line, ("dear", "hello", "hi,", "regards", "thanks")):
+        for info in infos:
+            if info.email_or_url or _contains_any(info.lower, _GREETING_WORDS):
                 continue
-            if self._looks_like_email_or_url(line):
-                continue
-            cand = self._extract_company_from_line(line)
+            cand = self._extract_company_from_line(info.text, info.lower)
             if cand:
                 return cand
 
         # 3) Fallback: short capitalized phrase
-        for line in lines[:12]:
-            if self._looks_like_email_or_url(line):
+        for info in infos:
+            if info.email_or_url:
                 continue
-            l = line.strip()
-            if self._text_has(l, ("team", "support", "helpdesk", "noreply", "no-reply")):
+            if _contains_any(info.lower, _ROLE_LINE_WORDS):
                 continue
-            if self._text_has(l, ("copyright", "©", "all rights reserved")):
+            if _contains_any(info.lower, _COPYRIGHT_LINE_WORDS):
                 continue
-            if self._text_has(l.lower(), CURRENCY_HINTS) and re.search(r"\d", l):
+            if _contains_any(info.lower, CURRENCY_HINTS) and _DIGIT_RE.search(info.lower):
                 continue
 
-            words = [w for w in re.split(r"\s+", l) if w]
+            l = info.text.strip()
+            words = l.split()
             if 1 <= len(words) <= 4 and all(any(ch.isalpha() for ch in w) for w in words):
                 return " ".join(w[0].upper() + w[1:] if w else w for w in words)
 
@@ -603,48 +736,38 @@ class ImprovedSignatureExtractor:
         """Filter out lines that are likely an email address or URL."""
         if "@" in s:
             return True
-        if re.search(r"https?://|\bwww\.", s, re.IGNORECASE):
+        if _URL_HINT_RE.search(s):
             return True
         # bare domain token
-        tokens = re.findall(r"[A-Za-z0-9.-]+\.[A-Za-z]{2,}", s)
-        return bool(tokens)
+        return bool(_BARE_DOMAIN_RE.search(s))
 
-    def extract_address(self, lines: List[str]) -> Optional[str]:
+    def extract_address(self, lines: List[str], infos: Optional[List[_LineInfo]] = None) -> Optional[str]:
         address_lines = []
-        address_keywords = [
-            r'\b(Street|St|Road|Rd|Avenue|Ave|Boulevard|Blvd|Lane|Ln|Drive|Dr)\b',
-            r'\b(Suite|Ste|Floor|Fl|Room|Unit|Building|Tower|Center|Centre)\b',
-            r'\b(City|State|Province|Country|Zip|Postal|Code)\b',
-            r'\d{3,6}',
-        ]
-        for line in lines:
-            line_cleaned = line.strip()
-            if re.search(self.email_pattern, line_cleaned) or re.search(self.phone_pattern, line_cleaned) or re.search(self.website_pattern, line_cleaned):
+        for info in infos or self._line_infos(lines):
+            if info.has_contact:
                 continue
+            line_cleaned = info.text.strip()
             if len(line_cleaned) < 5 or len(line_cleaned) > 120:
                 continue
-            if any(re.search(kw, line_cleaned, re.IGNORECASE) for kw in address_keywords):
-                cleaned = re.sub(r'[|\[\]{}]', '', line_cleaned).strip()
-                cleaned = re.sub(r'\s+', ' ', cleaned)
+            if any(kw.search(line_cleaned) for kw in _ADDRESS_RES):
+                cleaned = " ".join(_ADDRESS_JUNK_RE.sub('', line_cleaned).split())
                 if cleaned and cleaned not in address_lines:
                     address_lines.append(cleaned)
         return ', '.join(address_lines[:3]) if address_lines else None
 
     # ---------- main ----------
-    def extract_signature(self, raw_body: str, sender_header: str | None = None) -> dict:
+    def extract_signature(self, raw_body: str, sender_header: str | None = None, is_html: bool | None = None) -> dict:
         # Parse sender email + normalize to registered domain
         sender_email, sender_name = None, None
         sender_domain = None
         if sender_header:
-            sender_name, sender_email = parseaddr(sender_header)
+            sender_name, sender_email = _parse_sender(sender_header)
             if sender_email and "@" in sender_email:
                 raw_dom = sender_email.split("@", 1)[1].lower()
-                ext = tldextract.extract(raw_dom)
-                if ext.suffix:
-                    sender_domain = ".".join(p for p in [ext.domain, ext.suffix] if p)
+                sender_domain = _tld_parts(raw_dom)[0] or None
 
         # Extract links & cleaned text lines
-        _, lines = self._extract_links_and_text(raw_body)
+        links_domains, lines = self._extract_links_and_text(raw_body, is_html)
 
         # Focus on the likely signature block
         sig_start = self.find_signature_start(lines)
@@ -654,10 +777,12 @@ class ImprovedSignatureExtractor:
         # Components
         emails = self.extract_emails(sig_text)
         phones = self.extract_phones(sig_text)
-        website = self.extract_websites(raw_body, sig_lines, sender_domain)
-        company_name = self.extract_company_name(sig_lines, sender_domain)
-        job_title = self.extract_job_title(sig_lines)
-        address = self.extract_address(sig_lines)
+        website = self.extract_websites(raw_body, sig_lines, sender_domain, is_html, links_domains)
+        # classify each signature line once for the company/title/address scans
+        infos = self._line_infos(sig_lines)
+        company_name = self.extract_company_name(sig_lines, sender_domain, infos)
+        job_title = self.extract_job_title(sig_lines, infos)
+        address = self.extract_address(sig_lines, infos)
 
     # add inside ImprovedSignatureExtractor (near your other helpers)
         def _compose_full(self, first: Optional[str], last: Optional[str]) -> Optional[str]: